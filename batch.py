@@ -0,0 +1,170 @@
+import argparse
+import json
+import os
+import queue
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+# Add current directory to path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from engine.brain import MavrickBrain
+from engine.actions import MavrickActions
+from engine.resilience import Deadline
+
+
+def load_queries(path):
+    # Plain text (one query per line) or JSONL with {"id": ..., "query": ...}; blank lines and # comments are skipped.
+    queries = []
+    stream = sys.stdin if path == "-" else open(path, "r", encoding="utf-8-sig")
+    try:
+        for line_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    print(f"Skipping malformed JSON on line {line_number}.", file=sys.stderr)
+                    continue
+                query = str(item.get("query", "")).strip()
+                if query:
+                    queries.append({"id": item.get("id", line_number), "query": query})
+            else:
+                queries.append({"id": line_number, "query": line})
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    return queries
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round((pct / 100.0) * (len(ordered) - 1))))]
+
+
+class BatchRunner:
+    def __init__(self, concurrency=4, shared_context=False, deadline_seconds=None, user_name=None):
+        # A shared context is one conversation, so its turns must run in order.
+        self.shared_context = shared_context
+        self.concurrency = 1 if shared_context else max(1, int(concurrency))
+        self.deadline_seconds = deadline_seconds
+        self._brains = queue.Queue()
+        self._all_brains = []
+        for _ in range(self.concurrency):
+            brain = MavrickBrain(user_name=user_name, persist_conversation=False)
+            self._brains.put(brain)
+            self._all_brains.append(brain)
+
+    def _run_one(self, index, item):
+        brain = self._brains.get()
+        try:
+            if not self.shared_context:
+                brain.memory = [brain.memory[0]]
+            tokens_before = brain.total_tokens
+            cost_before = brain.session_cost
+            hits_before = brain.response_cache.hits
+            deadline = Deadline.after(self.deadline_seconds) if self.deadline_seconds else None
+            started = time.monotonic()
+            result = {"index": index, "id": item["id"], "query": item["query"]}
+            try:
+                result["response"] = brain.get_response(item["query"], deadline=deadline)
+                # The brain answers failures with an apology; last_error tells them apart from real replies.
+                result["ok"] = brain.last_error is None
+                if brain.last_error is not None:
+                    result["error"] = f"{type(brain.last_error).__name__}: {brain.last_error}"
+            except Exception as e:
+                result["response"] = None
+                result["ok"] = False
+                result["error"] = f"{type(e).__name__}: {e}"
+            result["latency_ms"] = int((time.monotonic() - started) * 1000)
+            result["model"] = brain.last_model
+            result["tokens"] = brain.total_tokens - tokens_before
+            result["cost"] = round(brain.session_cost - cost_before, 8)
+            result["cached"] = brain.response_cache.hits > hits_before
+            return result
+        finally:
+            self._brains.put(brain)
+
+    def run(self, queries, output):
+        started = time.monotonic()
+        results = []
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="mavrick-batch") as pool:
+            futures = [pool.submit(self._run_one, index, item) for index, item in enumerate(queries)]
+            # Written in input order as results become available, so partial output is still usable.
+            for future in futures:
+                result = future.result()
+                results.append(result)
+                output.write(json.dumps(result, ensure_ascii=False) + "\n")
+                output.flush()
+        elapsed = time.monotonic() - started
+        latencies = [result["latency_ms"] for result in results]
+        return {
+            "queries": len(results),
+            "succeeded": sum(1 for result in results if result["ok"]),
+            "failed": sum(1 for result in results if not result["ok"]),
+            "cached": sum(1 for result in results if result["cached"]),
+            "concurrency": self.concurrency,
+            "shared_context": self.shared_context,
+            "elapsed_seconds": round(elapsed, 3),
+            "queries_per_second": round(len(results) / elapsed, 3) if elapsed > 0 else None,
+            "latency_ms_p50": _percentile(latencies, 50),
+            "latency_ms_p95": _percentile(latencies, 95),
+            "tokens": sum(result["tokens"] for result in results),
+            "cost": round(sum(result["cost"] for result in results), 8)
+        }
+
+    def close(self):
+        for brain in self._all_brains:
+            brain.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run text queries through Mavrick without the HUD or audio.")
+    parser.add_argument("input", help="Query file (one per line, or JSONL with id/query); '-' reads stdin.")
+    parser.add_argument("-o", "--output", default="-", help="Results JSONL path (default: stdout).")
+    parser.add_argument("-m", "--metrics", help="Write run metrics as JSON to this path (default: stderr).")
+    parser.add_argument("-c", "--concurrency", type=int, default=4, help="Queries in flight at once (default: 4).")
+    parser.add_argument("--shared-context", action="store_true", help="Run all queries as one conversation, in order.")
+    parser.add_argument("--deadline", type=float, default=None, help="Per-query deadline in seconds.")
+    parser.add_argument("--allow-actions", action="store_true", help="Approve actions that normally ask for confirmation.")
+    args = parser.parse_args(argv)
+
+    load_dotenv(override=True)
+    # Nobody is there to click "Yes", so confirmations are denied unless explicitly allowed.
+    MavrickActions.set_confirm_callback(lambda action_type, detail: args.allow_actions)
+
+    queries = load_queries(args.input)
+    if not queries:
+        print("No queries found.", file=sys.stderr)
+        return 1
+
+    runner = BatchRunner(
+        concurrency=args.concurrency,
+        shared_context=args.shared_context,
+        deadline_seconds=args.deadline,
+        user_name=os.getenv("USER_NAME", "Sir")
+    )
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        metrics = runner.run(queries, output)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        runner.close()
+
+    if args.metrics:
+        with open(args.metrics, "w", encoding="utf-8") as file:
+            json.dump(metrics, file, indent=2)
+    else:
+        print(json.dumps(metrics), file=sys.stderr)
+    return 0 if metrics["failed"] == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -69,13 +69,34 @@ args = [
     '--hidden-import=engine.scheduler',
     '--hidden-import=engine.skills',
     '--hidden-import=engine.notes',
+    '--hidden-import=engine.note_recall',
     '--hidden-import=engine.command_history',
+    '--hidden-import=engine.command_completion',
     '--hidden-import=engine.session_log',
+    '--hidden-import=engine.tail',
+    '--hidden-import=engine.log_writer',
+    '--hidden-import=engine.event_store',
+    '--hidden-import=engine.transport',
+    '--hidden-import=engine.routing',
+    '--hidden-import=engine.metering',
+    '--hidden-import=engine.response_cache',
+    '--hidden-import=engine.intent_index',
+    '--hidden-import=engine.resilience',
+    '--hidden-import=engine.speculation',
+    '--hidden-import=engine.tool_cache',
+    '--hidden-import=engine.tool_output',
+    '--hidden-import=engine.conversation_store',
+    '--hidden-import=engine.startup',
     '--hidden-import=pystray',
     '--hidden-import=pystray._win32',
     '--hidden-import=pyttsx3',
     '--hidden-import=vosk',
     '--hidden-import=pytesseract',
+    '--hidden-import=pyaudio',                      # Loaded lazily via engine.startup.lazy_import
+    '--hidden-import=numpy',
+    '--hidden-import=psutil',
+    '--hidden-import=pygame',
+    '--hidden-import=PIL.ImageGrab',
     '--hidden-import=PIL._tkinter_finder',          # Fix for CTkImage
     '--hidden-import=babel.numbers',                # Common issue with some libs
     '--hidden-import=dotenv',                       # Explicitly import dotenv module
@@ -3,11 +3,15 @@ import sys
 import json
 import shutil
 import datetime
+import threading
 import webbrowser
-import psutil
 import platform
 from engine import vision
 from engine import notes
+from engine.startup import lazy_import
+from engine.tail import tail_jsonl
+from engine import log_writer
+from engine import event_store
 
 _DEFAULT_PROTOCOLS = {
     "work mode": ["start chrome https://github.com", "code", "calc"],
@@ -18,6 +22,11 @@ _DEFAULT_PROTOCOLS = {
 
 _CONFIRM_CALLBACK = None
 _AUDIT_CALLBACK = None
+# (path, (mtime_ns, size), protocols) for the last parse of protocols.json.
+_PROTOCOLS_CACHE = None
+_PROTOCOLS_VERSION = 0
+_PROTOCOLS_LOCK = threading.Lock()
+_PROTOCOL_LISTENERS = []
 _SCHEDULER = None
 
 def _app_base_dir():
@@ -55,8 +64,13 @@ def _normalize_protocols(data):
 
 def _write_protocols(path, protocols):
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as file:
+    # Write a sibling file and swap it in, so a crash never leaves a truncated protocols.json.
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
         json.dump(protocols, file, indent=2)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
 
 def _ensure_protocols_file():
     path = _protocols_path()
@@ -70,20 +84,68 @@ def _ensure_protocols_file():
         _write_protocols(path, _DEFAULT_PROTOCOLS)
     return path
 
-def _load_protocols():
-    path = _ensure_protocols_file()
+def _file_stamp(path):
     try:
-        with open(path, "r", encoding="utf-8") as file:
-            data = json.load(file)
-        return _normalize_protocols(data)
-    except Exception:
-        return _DEFAULT_PROTOCOLS.copy()
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+def _notify_protocols(protocols):
+    for listener in list(_PROTOCOL_LISTENERS):
+        try:
+            listener(protocols)
+        except Exception as e:
+            print(f"Protocols listener failed: {e}")
+
+def _load_protocols():
+    """Return the parsed protocols, re-reading protocols.json only when its mtime or size changes.
+
+    The returned dict is shared; copy it before modifying.
+    """
+    global _PROTOCOLS_CACHE, _PROTOCOLS_VERSION
+    with _PROTOCOLS_LOCK:
+        cache = _PROTOCOLS_CACHE
+        if cache is not None:
+            path, stamp, protocols = cache
+            if _file_stamp(path) == stamp:
+                return protocols
+        path = _ensure_protocols_file()
+        stamp = _file_stamp(path)
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            protocols = _normalize_protocols(data)
+        except Exception:
+            protocols = _DEFAULT_PROTOCOLS.copy()
+        changed = cache is None or cache[2] != protocols
+        _PROTOCOLS_CACHE = (path, stamp, protocols)
+        if changed:
+            _PROTOCOLS_VERSION += 1
+    if changed and cache is not None:
+        # Edited outside the app since the last read.
+        _notify_protocols(protocols)
+    return protocols
 
 def _save_protocols(protocols):
+    global _PROTOCOLS_CACHE, _PROTOCOLS_VERSION
     normalized = _normalize_protocols(protocols)
-    _write_protocols(_ensure_protocols_file(), normalized)
+    with _PROTOCOLS_LOCK:
+        path = _ensure_protocols_file()
+        _write_protocols(path, normalized)
+        _PROTOCOLS_CACHE = (path, _file_stamp(path), normalized)
+        _PROTOCOLS_VERSION += 1
+    _notify_protocols(normalized)
     return normalized
 
+def _reload_protocols():
+    global _PROTOCOLS_CACHE
+    with _PROTOCOLS_LOCK:
+        if _PROTOCOLS_CACHE is not None:
+            # Forget the stamp so the next load re-reads the file.
+            _PROTOCOLS_CACHE = (_PROTOCOLS_CACHE[0], None, _PROTOCOLS_CACHE[2])
+    return _load_protocols()
+
 def _action_log_path():
     return os.path.join(_user_data_dir(), "actions.log")
 
@@ -115,13 +177,7 @@ def _audit_action(action_type, detail, status):
         "status": str(status)
     }
 
-    try:
-        os.makedirs(_user_data_dir(), exist_ok=True)
-        with open(_action_log_path(), "a", encoding="utf-8") as file:
-            json.dump(entry, file, ensure_ascii=True)
-            file.write("\n")
-    except Exception:
-        pass
+    log_writer.get_writer().write(_action_log_path(), entry)
 
     if _AUDIT_CALLBACK:
         try:
@@ -130,29 +186,14 @@ def _audit_action(action_type, detail, status):
             pass
 
 def _read_action_log(limit=100):
-    path = _action_log_path()
-    if not os.path.exists(path):
-        return []
+    log_writer.get_writer().flush()
     try:
-        with open(path, "r", encoding="utf-8") as file:
-            lines = file.read().splitlines()
-        entries = []
-        for line in lines[-limit:]:
-            try:
-                entries.append(json.loads(line))
-            except Exception:
-                continue
-        return entries
+        return tail_jsonl(_action_log_path(), limit, archives=True)
     except Exception:
         return []
 
 def _clear_action_log():
-    path = _action_log_path()
-    if os.path.exists(path):
-        try:
-            os.remove(path)
-        except Exception:
-            pass
+    log_writer.get_writer().remove(_action_log_path())
 
 class MavrickActions:
     @staticmethod
@@ -185,6 +226,12 @@ class MavrickActions:
             lines.append(f"{reminder.get('id')} | {reminder.get('due_at')} | {reminder.get('message')}")
         return "Upcoming reminders:\n" + "\n".join(lines)
 
+    @staticmethod
+    def get_reminders_version():
+        if not _SCHEDULER:
+            return 0
+        return _SCHEDULER.get_version()
+
     @staticmethod
     def get_reminders():
         if not _SCHEDULER:
@@ -275,7 +322,23 @@ class MavrickActions:
 
     @staticmethod
     def get_protocols():
-        return _load_protocols()
+        return dict(_load_protocols())
+
+    @staticmethod
+    def reload_protocols():
+        return dict(_reload_protocols())
+
+    @staticmethod
+    def get_protocols_version():
+        # Loading first picks up edits made outside the app; it is a single stat when nothing changed.
+        _load_protocols()
+        return _PROTOCOLS_VERSION
+
+    @staticmethod
+    def add_protocols_listener(callback):
+        # callback(protocols) runs after every save and whenever an outside edit is picked up.
+        if callback not in _PROTOCOL_LISTENERS:
+            _PROTOCOL_LISTENERS.append(callback)
 
     @staticmethod
     def save_protocols(protocols):
@@ -284,7 +347,7 @@ class MavrickActions:
 
     @staticmethod
     def upsert_protocol(protocol_name, commands):
-        protocols = _load_protocols()
+        protocols = dict(_load_protocols())
         normalized_name = protocol_name.strip().lower()
         protocols[normalized_name] = commands
         _save_protocols(protocols)
@@ -292,7 +355,7 @@ class MavrickActions:
 
     @staticmethod
     def delete_protocol(protocol_name):
-        protocols = _load_protocols()
+        protocols = dict(_load_protocols())
         normalized_name = protocol_name.strip().lower()
         if normalized_name in protocols:
             del protocols[normalized_name]
@@ -349,6 +412,46 @@ class MavrickActions:
             lines.append(f"{item.get('id')} | {item.get('created_at')} | {item.get('text')}")
         return "Notes:\n" + "\n".join(lines)
 
+    @staticmethod
+    def search_notes(query, limit=5):
+        items = notes.search_notes(query, limit=limit)
+        if not items:
+            return f"No notes match '{query}'."
+        lines = []
+        for item in items:
+            lines.append(f"{item.get('id')} | {item.get('created_at')} | {item.get('text')}")
+        return "Matching notes:\n" + "\n".join(lines)
+
+    @staticmethod
+    def search_history(source=None, kind=None, status=None, since=None, until=None, text=None, limit=20):
+        sources = None if not source or source == "all" else [source]
+        try:
+            limit = max(1, min(100, int(limit)))
+        except (ValueError, TypeError):
+            limit = 20
+        try:
+            events = event_store.search(
+                limit=limit,
+                sources=sources,
+                kinds=[kind] if kind else None,
+                statuses=[status] if status else None,
+                since=since,
+                until=until,
+                text=text
+            )
+        except ValueError as exc:
+            return str(exc)
+        if not events:
+            return "No matching history entries."
+        lines = []
+        for event in events:
+            fields = [event["timestamp"], event["source"], event["kind"]]
+            if event["status"]:
+                fields.append(event["status"])
+            fields.append(event["text"])
+            lines.append(" | ".join(fields))
+        return "History (newest first):\n" + "\n".join(lines)
+
     @staticmethod
     def get_notes():
         return notes.list_notes(limit=200)
@@ -363,6 +466,7 @@ class MavrickActions:
 
     @staticmethod
     def get_system_stats():
+        psutil = lazy_import("psutil")
         cpu = psutil.cpu_percent()
         ram = psutil.virtual_memory().percent
         battery = psutil.sensors_battery()
@@ -1,41 +1,240 @@
 import os
 import json
-from openai import OpenAI
+import hashlib
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from engine.actions import MavrickActions
+from engine import notes
 from engine.skills import SkillManager
+from engine import transport
+from engine.resilience import Deadline, DeadlineExceeded, LatencyTracker, call_async
+from engine.routing import ModelRouter
+from engine.metering import get_meter
+from engine.response_cache import ResponseCache, CACHEABLE_TOOLS, is_cacheable_query
+from engine.intent_index import IntentIndex
+from engine.speculation import predict_tools, tool_key
+from engine.tool_cache import ToolCache
+from engine.tool_output import ToolOutputGovernor
+from engine.conversation_store import ConversationStore
 
 load_dotenv(override=True)
 
+# Kept byte-for-byte stable so the provider can cache the request prefix.
+# Anything that varies per session or per turn belongs at the tail of the request.
+SYSTEM_PROMPT = (
+    "You are Mavrick, a highly intelligent AI assistant (like JARVIS). You are helpful and witty. "
+    "You have access to system tools. Use them to help the user with time, date, opening apps, "
+    "searching the web, system stats, media control, notes, reminders, custom skills, and running "
+    "complex protocols. Protocols are user-defined; call list_protocols to see available names. "
+    "Custom skills may be available; call list_skills to see what's loaded. You can also switch your "
+    "persona between Mavrick (default), Jarvis (polite/British), and Friday (efficient/sharp)."
+)
+
+# Tools without side effects; several of these in one turn run concurrently.
+READ_ONLY_TOOLS = {"get_system_info", "list_protocols", "list_skills", "list_reminders", "list_notes", "search_notes", "search_history", "read_tool_output"}
+
+# Write tools and the memoization groups they invalidate.
+TOOL_INVALIDATES = {
+    "add_note": ("notes",),
+    "delete_note": ("notes",),
+    "schedule_reminder": ("reminders",),
+    "cancel_reminder": ("reminders",)
+}
+
+def _consume_task_result(task):
+    if not task.cancelled():
+        task.exception()
+
 class MavrickBrain:
-    def __init__(self, user_name=None, summary=None):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    def __init__(self, user_name=None, summary=None, persist_conversation=True):
+        # All model I/O runs on one event loop thread; blocking tools go to the executor.
+        self._loop = asyncio.new_event_loop()
+        self.client = transport.get_async_openai_client(self._loop)
+        self._loop_thread = threading.Thread(target=self._run_loop, name="mavrick-brain", daemon=True)
+        self._loop_thread.start()
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="mavrick-tool")
+        self._pending = None
+        self._pending_lock = threading.Lock()
         self.user_name = user_name or os.getenv("USER_NAME", "Sir")
         summary_text = summary.strip() if isinstance(summary, str) else ""
         self.summary = summary_text
+        # Previous-session summary is sent after the conversation, never in the prefix.
+        self.session_context = summary_text
         self.memory = [
-            {"role": "system", "content": f"You are Mavrick, a highly intelligent AI assistant (like JARVIS). You are helpful and witty. You have access to system tools. Use them to help the user with time, date, opening apps, searching the web, system stats, media control, notes, reminders, custom skills, and running complex protocols. Protocols are user-defined; call list_protocols to see available names. Custom skills may be available; call list_skills to see what's loaded. You can also switch your persona between Mavrick (default), Jarvis (polite/British), and Friday (efficient/sharp)."}
+            {"role": "system", "content": SYSTEM_PROMPT}
         ]
-        if summary_text:
-            self.memory.append({"role": "system", "content": f"Memory summary (previous session): {summary_text}"})
         self.total_cost = 0.0
         self.total_tokens = 0
         self.session_cost = 0.0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
         
-        # Load starting balance from .env (fallback to 0.0)
-        try:
-            self.current_balance = float(os.getenv("OPENAI_BALANCE", "0.0"))
-        except (ValueError, TypeError):
-            self.current_balance = 0.0
+        # Balance starts from OPENAI_BALANCE and is carried across sessions by the meter.
+        self.meter = get_meter()
+        self.current_balance = self.meter.balance
         
         self.debug_mode = os.getenv("DEBUG_MODE", "False") == "True"
+        self.response_cache_enabled = os.getenv("RESPONSE_CACHE", "True").lower() == "true"
+        try:
+            cache_ttl = float(os.getenv("RESPONSE_CACHE_TTL", "600"))
+        except (ValueError, TypeError):
+            cache_ttl = 600.0
+        self.response_cache = ResponseCache(max_entries=128, ttl_seconds=cache_ttl)
+        self.intent_index = None
+        if os.getenv("SEMANTIC_CACHE", "False").lower() == "true":
+            try:
+                threshold = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.85"))
+            except (ValueError, TypeError):
+                threshold = 0.85
+            self.intent_index = IntentIndex(threshold=threshold)
         self.skill_manager = SkillManager()
-        self.tools = self._build_tools()
+        self.router = ModelRouter()
+        try:
+            self.default_deadline = float(os.getenv("LLM_DEADLINE_SECONDS", "30"))
+        except (ValueError, TypeError):
+            self.default_deadline = 30.0
+        try:
+            self.retry_attempts = max(1, int(os.getenv("LLM_RETRY_ATTEMPTS", "3")))
+        except (ValueError, TypeError):
+            self.retry_attempts = 3
+        self.hedge_requests = os.getenv("HEDGE_REQUESTS", "False").lower() == "true"
+        self.speculative_tools = os.getenv("SPECULATIVE_TOOLS", "True").lower() == "true"
+        self.speculation_hits = 0
+        self.speculation_wasted = 0
+        self._latency = {}
+        self.last_model = self.router.main_model
+        self.last_error = None
+        self.model_calls = {}
+        try:
+            output_budget = int(os.getenv("TOOL_OUTPUT_MAX_CHARS", "2000"))
+        except (ValueError, TypeError):
+            output_budget = 2000
+        self.output_governor = ToolOutputGovernor(
+            default_budget=output_budget,
+            page_chars=output_budget,
+            budgets={"list_notes": output_budget * 2, "list_reminders": output_budget * 2, "read_tool_output": output_budget + 200},
+            on_prune=self._forget_spilled_outputs
+        )
+        self.tool_cache = ToolCache()
+        self.tool_cache.declare("list_protocols", version=MavrickActions.get_protocols_version)
+        self.tool_cache.declare("list_notes", version=notes.get_version, groups=["notes"])
+        self.tool_cache.declare("search_notes", version=notes.get_version, groups=["notes"])
+        self.tool_cache.declare("list_reminders", version=MavrickActions.get_reminders_version, groups=["reminders"])
+        self.tool_cache.declare("list_skills", version=lambda: self.tools_fingerprint)
+        self.tool_cache.declare("get_system_info", ttl=1.0)
+        self.conversation_store = None
+        if persist_conversation and os.getenv("CONVERSATION_STORE", "True").lower() == "true":
+            self.conversation_store = ConversationStore()
+        try:
+            self.restore_turns = max(0, int(os.getenv("RESTORE_TURNS", "3")))
+        except (ValueError, TypeError):
+            self.restore_turns = 3
+        self._restored = False
+        self.tools = []
+        self.tools_fingerprint = ""
+        self.refresh_tools()
 
     def log_debug(self, msg):
         if self.debug_mode:
             print(f" [DEBUG] [BRAIN]: {msg}")
 
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def submit_query(self, user_input, deadline=None):
+        future = asyncio.run_coroutine_threadsafe(self.get_response_async(user_input, deadline=deadline), self._loop)
+        with self._pending_lock:
+            self._pending = future
+        return future
+
+    def cancel_pending(self):
+        with self._pending_lock:
+            future = self._pending
+            self._pending = None
+        if future and not future.done():
+            self.log_debug("Cancelling in-flight query.")
+            return future.cancel()
+        return False
+
+    def is_busy(self):
+        with self._pending_lock:
+            return bool(self._pending and not self._pending.done())
+
+    def close(self):
+        self.cancel_pending()
+        try:
+            asyncio.run_coroutine_threadsafe(transport.aclose(), self._loop).result(timeout=2)
+        except Exception:
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._executor.shutdown(wait=False)
+        if self.conversation_store:
+            self.conversation_store.close()
+
+    def warm_up(self):
+        # Opens the pooled connection on the brain loop so the first turn skips the TLS handshake.
+        return asyncio.run_coroutine_threadsafe(transport.warm_up_async(), self._loop)
+
+    async def _complete(self, deadline, stage, tools_used=None, **kwargs):
+        model = kwargs.get("model")
+        tracker = self._latency.setdefault(model, LatencyTracker())
+
+        def _make_call(timeout):
+            if timeout is not None:
+                return self.client.chat.completions.create(timeout=timeout, **kwargs)
+            return self.client.chat.completions.create(**kwargs)
+
+        started = time.monotonic()
+        response = await call_async(_make_call, deadline=deadline, attempts=self.retry_attempts, tracker=tracker, hedge=self.hedge_requests)
+        if tools_used is None:
+            tool_calls = getattr(response.choices[0].message, "tool_calls", None) or []
+            tools_used = [tool_call.function.name for tool_call in tool_calls]
+        # Every completion is billed where it is made, so no stage can be missed.
+        self._record_usage(response.usage, model, stage=stage, tools=tools_used, latency=time.monotonic() - started)
+        return response
+
+    async def _run_tool(self, func_name, args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._execute_tool, func_name, args)
+
+    def _start_speculation(self, user_input):
+        # Start likely read-only tools while the model is still deciding what to call.
+        if not self.speculative_tools:
+            return {}
+        tasks = {}
+        for name, args in predict_tools(user_input):
+            tasks[tool_key(name, args)] = asyncio.ensure_future(self._run_tool(name, args))
+        if tasks:
+            self.log_debug(f"Speculatively prefetching: {', '.join(tasks.keys())}")
+        return tasks
+
+    async def _run_tool_prefetched(self, step, speculative):
+        task = speculative.pop(tool_key(step["name"], step["arguments"]), None)
+        if task is not None:
+            try:
+                result = await task
+                self.speculation_hits += 1
+                return result
+            except Exception:
+                pass
+        return await self._run_tool(step["name"], step["arguments"])
+
+    def _discard_speculation(self, speculative, keep=()):
+        # Cancels every prefetch not in `keep` and retrieves its outcome so failures are not reported as unhandled.
+        for key in [key for key in speculative if key not in keep]:
+            task = speculative.pop(key)
+            if task.done():
+                if not task.cancelled():
+                    task.exception()
+            else:
+                task.cancel()
+                task.add_done_callback(_consume_task_result)
+            self.speculation_wasted += 1
+
     def _normalize_message(self, message):
         if isinstance(message, dict):
             return message
@@ -65,6 +264,120 @@ class MavrickBrain:
             return message.get(key, default)
         return getattr(message, key, default)
 
+    def _canonicalize(self, value):
+        # Round-trip through sorted JSON so dict ordering can never change the serialized bytes.
+        return json.loads(json.dumps(value, sort_keys=True, ensure_ascii=True))
+
+    def refresh_tools(self):
+        tools = self._build_tools()
+        tools = sorted(tools, key=lambda tool: tool.get("function", {}).get("name", ""))
+        tools = self._canonicalize(tools)
+        fingerprint = hashlib.sha1(json.dumps(tools, sort_keys=True).encode("utf-8")).hexdigest()
+        if fingerprint != self.tools_fingerprint:
+            self.tools = tools
+            self.tools_fingerprint = fingerprint
+            for name, skill in self.skill_manager.skills.items():
+                self.tool_cache.forget(name)
+                self.tool_cache.declare(name, ttl=skill.get("cache_ttl"))
+            self.log_debug(f"Tool schema frozen ({len(tools)} tools, {fingerprint[:10]}).")
+        return self.tools
+
+    def reload_skills(self):
+        self.skill_manager.load_skills()
+        return self.refresh_tools()
+
+    def _request_messages(self):
+        messages = list(self.memory)
+        if self.session_context:
+            messages.append({"role": "system", "content": f"Memory summary (previous session): {self.session_context}"})
+        return messages
+
+    def _record_usage(self, usage, model, stage=None, tools=None, latency=None):
+        self.model_calls[model] = self.model_calls.get(model, 0) + 1
+        if not usage:
+            return 0.0
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = (getattr(details, "cached_tokens", 0) or 0) if details else 0
+        self.log_debug(f"TOKEN USAGE [{model}]: prompt={prompt_tokens} (cached={cached}), completion={completion_tokens}, total={usage.total_tokens}")
+        self.total_tokens += usage.total_tokens
+        self.prompt_tokens += prompt_tokens
+        self.cached_tokens += cached
+        cost = self.meter.record_llm(
+            model,
+            prompt_tokens=prompt_tokens,
+            cached_tokens=cached,
+            completion_tokens=completion_tokens,
+            latency=latency,
+            stage=stage,
+            tools=tools
+        )
+        self.session_cost += cost
+        self.current_balance = self.meter.balance
+        return cost
+
+    def _tool_state_version(self):
+        return (
+            MavrickActions.get_protocols_version(),
+            notes.get_version(),
+            self.tools_fingerprint,
+            self.user_name
+        )
+
+    def _cached_response(self, user_input):
+        if not self.response_cache_enabled or not is_cacheable_query(user_input):
+            return None
+        cached = self.response_cache.get(user_input, self._tool_state_version())
+        if cached is None:
+            return None
+        self.log_debug("Response cache hit. Skipping model round trip.")
+        turn_start = len(self.memory)
+        self.memory.append({"role": "user", "content": user_input})
+        self.memory.append({"role": "assistant", "content": cached})
+        self._commit_turn(turn_start)
+        return cached
+
+    async def _replay_intent(self, user_input):
+        if not self.intent_index:
+            return None
+        match = self.intent_index.match(user_input)
+        if not match:
+            return None
+        self.log_debug(f"Intent match ({match['score']:.2f}) with '{match['query']}'. Replaying cached tool plan.")
+        results = []
+        for step in match["plan"]:
+            result = await self._run_tool(step["name"], step.get("arguments") or {})
+            if result.startswith("SWITCHING_PERSONA_TO_"):
+                # main.py expects the persona marker on its own.
+                results = [result]
+                break
+            results.append(result)
+        reply = "\n".join(results)
+        turn_start = len(self.memory)
+        self.memory.append({"role": "user", "content": user_input})
+        self.memory.append({"role": "assistant", "content": reply})
+        self._commit_turn(turn_start)
+        return reply
+
+    def get_cache_hit_rate(self):
+        if not self.prompt_tokens:
+            return 0.0
+        return self.cached_tokens / self.prompt_tokens
+
+    def get_tool_stats(self):
+        """Session totals for tool memoization, output trimming and speculative prefetch."""
+        memo = self.tool_cache.stats().values()
+        governed = self.output_governor.stats().values()
+        return {
+            "memo_hits": sum(stats["hits"] for stats in memo),
+            "memo_lookups": sum(stats["hits"] + stats["misses"] for stats in memo),
+            "tokens_trimmed": sum(stats["raw_tokens"] - stats["kept_tokens"] for stats in governed),
+            "spilled": sum(stats["spilled"] for stats in governed),
+            "prefetch_hits": self.speculation_hits,
+            "prefetch_wasted": self.speculation_wasted
+        }
+
     def _build_tools(self):
         tools = [
             {
@@ -246,6 +559,40 @@ class MavrickBrain:
                     }
                 }
             },
+            {
+                "type": "function",
+                "function": {
+                    "name": "search_notes",
+                    "description": "Search all saved notes, ranked by relevance (BM25), best matches first. Prefer this over list_notes when the user asks what they noted about something or for older notes.",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "query": {"type": "string"},
+                            "limit": {"type": "integer", "description": "Maximum notes to return (default 5)."}
+                        },
+                        "required": ["query"]
+                    }
+                }
+            },
+            {
+                "type": "function",
+                "function": {
+                    "name": "search_history",
+                    "description": "Search past activity: HUD session log, commands the user gave, and actions Mavrick ran and their status (executed, blocked, failed, missing). Newest first.",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "source": {"type": "string", "enum": ["all", "session", "command", "action"], "description": "Which log to search (default all)."},
+                            "kind": {"type": "string", "description": "Action type for actions (e.g. open_app), voice/text for commands, log kind for the session log."},
+                            "status": {"type": "string", "description": "Action status to match: executed, blocked, failed or missing."},
+                            "since": {"type": "string", "description": "Start of the range: 'today', 'yesterday', '7d' (seven days ago) or an ISO date/datetime."},
+                            "until": {"type": "string", "description": "End of the range, same formats; a bare date includes the whole day."},
+                            "text": {"type": "string", "description": "Substring to look for in the entry text."},
+                            "limit": {"type": "integer", "description": "Maximum entries to return (default 20)."}
+                        }
+                    }
+                }
+            },
             {
                 "type": "function",
                 "function": {
@@ -260,6 +607,21 @@ class MavrickBrain:
                     }
                 }
             },
+            {
+                "type": "function",
+                "function": {
+                    "name": "read_tool_output",
+                    "description": "Read a page of a long tool output that was truncated and saved under a handle.",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "handle": {"type": "string"},
+                            "page": {"type": "integer"}
+                        },
+                        "required": ["handle"]
+                    }
+                }
+            },
             {
                 "type": "function",
                 "function": {
@@ -279,151 +641,249 @@ class MavrickBrain:
         tools.extend(self.skill_manager.get_tools())
         return tools
 
-    def get_response(self, user_input):
+    def _execute_tool(self, func_name, args):
+        result = self.tool_cache.call(func_name, args, self._governed_dispatch)
+        for group in TOOL_INVALIDATES.get(func_name, ()):
+            self.tool_cache.bump(group)
+        return result
+
+    def _forget_spilled_outputs(self, handles):
+        markers = tuple(f"handle '{handle}'" for handle in handles)
+        self.tool_cache.invalidate_where(lambda value: isinstance(value, str) and any(marker in value for marker in markers))
+
+    def _governed_dispatch(self, func_name, args):
+        # Bound what enters memory; oversized output is spilled to disk behind a pageable handle.
+        return self.output_governor.govern(func_name, self._dispatch_tool(func_name, args))
+
+    def _dispatch_tool(self, func_name, args):
+        if func_name == "get_system_info":
+            if args["category"] == "time": result = MavrickActions.get_time()
+            elif args["category"] == "date": result = MavrickActions.get_date()
+            else: result = MavrickActions.get_system_stats()
+        elif func_name == "open_application":
+            result = MavrickActions.open_app(args["app_name"])
+        elif func_name == "web_search":
+            result = MavrickActions.search_web(args["query"])
+        elif func_name == "initiate_protocol":
+            result = MavrickActions.run_protocol(args["protocol_name"])
+        elif func_name == "media_control":
+            result = MavrickActions.media_control(args["action"])
+        elif func_name == "switch_persona":
+            # We return a special string for main.py to handle the external voice change
+            result = f"SWITCHING_PERSONA_TO_{args['persona'].upper()}"
+        elif func_name == "list_protocols":
+            protocols = MavrickActions.list_protocols()
+            if protocols:
+                result = "Available protocols: " + ", ".join(protocols)
+            else:
+                result = "No protocols are available."
+        elif func_name == "list_skills":
+            skills = self.skill_manager.list_skills()
+            if skills:
+                result = "Available skills: " + ", ".join(skills)
+            else:
+                result = "No skills are loaded."
+        elif func_name == "schedule_reminder":
+            result = MavrickActions.schedule_reminder(args["message"], args["when"])
+        elif func_name == "list_reminders":
+            result = MavrickActions.list_reminders()
+        elif func_name == "cancel_reminder":
+            result = MavrickActions.cancel_reminder(args["reminder_id"])
+        elif func_name == "screen_ocr":
+            result = MavrickActions.screen_ocr(args.get("region"), args.get("save", False))
+        elif func_name == "add_note":
+            result = MavrickActions.add_note(args["text"])
+        elif func_name == "list_notes":
+            result = MavrickActions.list_notes()
+        elif func_name == "search_notes":
+            result = MavrickActions.search_notes(args["query"], args.get("limit", 5))
+        elif func_name == "delete_note":
+            result = MavrickActions.delete_note(args["note_id"])
+        elif func_name == "search_history":
+            result = MavrickActions.search_history(
+                source=args.get("source"),
+                kind=args.get("kind"),
+                status=args.get("status"),
+                since=args.get("since"),
+                until=args.get("until"),
+                text=args.get("text"),
+                limit=args.get("limit", 20)
+            )
+        elif func_name == "read_tool_output":
+            result = self.output_governor.read_page(args["handle"], args.get("page", 1))
+        elif func_name in self.skill_manager.skills:
+            result = self.skill_manager.execute(func_name, args)
+        else:
+            result = f"Unknown tool: {func_name}"
+        return result
+
+    def get_response(self, user_input, deadline=None):
+        return self.submit_query(user_input, deadline=deadline).result()
+
+    async def get_response_async(self, user_input, deadline=None):
+        if deadline is None:
+            deadline = Deadline.after(self.default_deadline)
+        self._restore_recent_turns()
+        self.last_error = None
+        if self.skill_manager.changed():
+            # A skill was added, removed or edited on disk: rebuild the frozen tool prefix first.
+            self.log_debug("Skills changed on disk. Reloading.")
+            self.reload_skills()
+        cached = self._cached_response(user_input)
+        if cached is not None:
+            return cached
+        replayed = await self._replay_intent(user_input)
+        if replayed is not None:
+            return replayed
+
         if self.current_balance <= 0:
             return f"I apologize, {self.user_name}, but your OpenAI balance has reached zero. Please top up your account to continue our interaction."
-            
+
+        turn_start = len(self.memory)
         self.memory.append({"role": "user", "content": user_input})
-        self.log_debug(f"Processing query through GPT-4o. Memory depth: {len(self.memory)}")
-        
+        model = self.router.route_query(user_input, balance=self.current_balance)
+        self.last_model = model
+        self.log_debug(f"Processing query through {model}. Memory depth: {len(self.memory)}")
+        speculative = self._start_speculation(user_input)
+
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=self.memory,
+            response = await self._complete(
+                deadline,
+                "query",
+                model=model,
+                messages=self._request_messages(),
                 tools=self.tools,
                 tool_choice="auto"
             )
-            
+
             msg = response.choices[0].message
-            
+
             if msg.tool_calls:
                 self.log_debug(f"Logic sequence triggered. {len(msg.tool_calls)} tool calls requested.")
                 # Add the assistant message with tool calls to memory ONCE
                 self.memory.append(self._normalize_message(msg))
-                
+                used_tools = set()
+                tool_plan = []
+
                 for tool_call in msg.tool_calls:
                     func_name = tool_call.function.name
+                    used_tools.add(func_name)
                     args = json.loads(tool_call.function.arguments)
+                    tool_plan.append({"name": func_name, "arguments": args})
                     self.log_debug(f"TOOL EXECUTION: {func_name}({args})")
-                    
-                    if func_name == "get_system_info":
-                        if args["category"] == "time": result = MavrickActions.get_time()
-                        elif args["category"] == "date": result = MavrickActions.get_date()
-                        else: result = MavrickActions.get_system_stats()
-                    elif func_name == "open_application":
-                        result = MavrickActions.open_app(args["app_name"])
-                    elif func_name == "web_search":
-                        result = MavrickActions.search_web(args["query"])
-                    elif func_name == "initiate_protocol":
-                        result = MavrickActions.run_protocol(args["protocol_name"])
-                    elif func_name == "media_control":
-                        result = MavrickActions.media_control(args["action"])
-                    elif func_name == "switch_persona":
-                        # We return a special string for main.py to handle the external voice change
-                        result = f"SWITCHING_PERSONA_TO_{args['persona'].upper()}"
-                    elif func_name == "list_protocols":
-                        protocols = MavrickActions.list_protocols()
-                        if protocols:
-                            result = "Available protocols: " + ", ".join(protocols)
-                        else:
-                            result = "No protocols are available."
-                    elif func_name == "list_skills":
-                        skills = self.skill_manager.list_skills()
-                        if skills:
-                            result = "Available skills: " + ", ".join(skills)
-                        else:
-                            result = "No skills are loaded."
-                    elif func_name == "schedule_reminder":
-                        result = MavrickActions.schedule_reminder(args["message"], args["when"])
-                    elif func_name == "list_reminders":
-                        result = MavrickActions.list_reminders()
-                    elif func_name == "cancel_reminder":
-                        result = MavrickActions.cancel_reminder(args["reminder_id"])
-                    elif func_name == "screen_ocr":
-                        result = MavrickActions.screen_ocr(args.get("region"), args.get("save", False))
-                    elif func_name == "add_note":
-                        result = MavrickActions.add_note(args["text"])
-                    elif func_name == "list_notes":
-                        result = MavrickActions.list_notes()
-                    elif func_name == "delete_note":
-                        result = MavrickActions.delete_note(args["note_id"])
-                    elif func_name in self.skill_manager.skills:
-                        result = self.skill_manager.execute(func_name, args)
-                    else:
-                        result = f"Unknown tool: {func_name}"
-                    
+
+                if used_tools <= READ_ONLY_TOOLS:
+                    self._discard_speculation(speculative, keep={tool_key(step["name"], step["arguments"]) for step in tool_plan})
+                    tool_results = await asyncio.gather(*(self._run_tool_prefetched(step, speculative) for step in tool_plan))
+                else:
+                    # Prefetched reads may be stale once a write runs in the same turn.
+                    self._discard_speculation(speculative)
+                    # Side-effecting tools may ask for confirmation, so keep them in order.
+                    tool_results = []
+                    for step in tool_plan:
+                        tool_results.append(await self._run_tool(step["name"], step["arguments"]))
+
+                for tool_call, step, result in zip(msg.tool_calls, tool_plan, tool_results):
                     self.log_debug(f"TOOL RESULT: {result[:50]}...")
                     # Append each tool response
-                    self.memory.append({"role": "tool", "tool_call_id": tool_call.id, "name": func_name, "content": result})
-                
+                    self.memory.append({"role": "tool", "tool_call_id": tool_call.id, "name": step["name"], "content": result})
+
                 # Get final response after tool execution
-                self.log_debug("Synthesizing final response from tool data...")
-                second_response = self.client.chat.completions.create(
-                    model="gpt-4o",
-                    messages=self.memory
+                synthesis_model = self.router.route_synthesis(model, tool_results, balance=self.current_balance)
+                self.log_debug(f"Synthesizing final response from tool data via {synthesis_model}...")
+                second_response = await self._complete(
+                    deadline,
+                    "synthesis",
+                    tools_used=sorted(used_tools),
+                    model=synthesis_model,
+                    messages=self._request_messages(),
+                    tools=self.tools,
+                    tool_choice="none"
                 )
                 assistant_message = second_response.choices[0].message.content
-                usage = second_response.usage
+                if self.intent_index:
+                    self.intent_index.add(user_input, tool_plan)
             else:
+                self._discard_speculation(speculative)
                 self.log_debug("Direct response generated (No tool calls).")
                 assistant_message = msg.content
-                usage = response.usage
-
-            if usage:
-                self.log_debug(f"TOKEN USAGE: prompt={usage.prompt_tokens}, completion={usage.completion_tokens}, total={usage.total_tokens}")
-                self.total_tokens += usage.total_tokens
-                # GPT-4o pricing (approx): 
-                # Input: $2.50 / 1M tokens
-                # Output: $10.00 / 1M tokens
-                input_cost = (usage.prompt_tokens / 1_000_000) * 2.50
-                output_cost = (usage.completion_tokens / 1_000_000) * 10.00
-                cost = input_cost + output_cost
-                
-                self.session_cost += cost
-                self.current_balance -= cost
-                
-                # Prevent balance from going negative in display (if desired, though usually it just hits 0)
-                if self.current_balance < 0:
-                    self.current_balance = 0.0
-
-            if not msg.tool_calls:
-                # Only add if it wasn't already added (if no tool calls)
-                self.memory.append({"role": "assistant", "content": assistant_message})
-            else:
-                # Add the final chat response as well
-                self.memory.append({"role": "assistant", "content": assistant_message})
-
-            # Safer memory cleanup: don't break assistant-tool-assistant chains crudely
-            if len(self.memory) > 30: # Increased threshold for safety
-                self.log_debug("Memory threshold reached. Optimizing conversation context...")
-                # Always preserve the system prompt (index 0)
-                system_prompt = self.memory[0]
-                
-                # We want to keep about 15 messages, but we MUST start with a 'user' message
-                # to satisfy OpenAI's requirement that tool responses follow assistant calls.
-                start_index = len(self.memory) - 15
-                
-                # Search forward from start_index to find the first 'user' message
-                new_start = -1
-                for i in range(start_index, len(self.memory)):
-                    if self._message_get(self.memory[i], "role") == "user":
-                        new_start = i
-                        break
-                
-                if new_start != -1:
-                    self.memory = [system_prompt] + self.memory[new_start:]
-                    self.log_debug(f"Context optimized. New memory depth: {len(self.memory)}")
-                else:
-                    # Fallback if no user message found in the last 15 (unlikely but safe)
-                    self.memory = [system_prompt] + self.memory[-2:]
-                    self.log_debug("Fallback context reset performed.")
+                used_tools = set()
+
+            # Plain chat depends on the conversation so far; only answers built from cacheable tools are reusable.
+            if self.response_cache_enabled and used_tools and used_tools <= CACHEABLE_TOOLS and is_cacheable_query(user_input):
+                self.response_cache.put(user_input, self._tool_state_version(), assistant_message)
+
+            self.memory.append({"role": "assistant", "content": assistant_message})
+            self._commit_turn(turn_start)
 
-            self.summary = self._build_summary()
-                    
             return assistant_message
-            
+
+        except asyncio.CancelledError:
+            # Drop the half-finished turn so the next request never sees a dangling tool call.
+            del self.memory[turn_start:]
+            self.log_debug("Query cancelled. Turn rolled back.")
+            raise
+        except DeadlineExceeded as e:
+            self.last_error = e
+            del self.memory[turn_start + 1:]
+            self.log_debug("Query deadline exceeded.")
+            return f"I apologize, {self.user_name}, but that request took too long. Please try again."
         except Exception as e:
+            self.last_error = e
+            del self.memory[turn_start + 1:]
             return f"I apologize, {self.user_name}, but I encountered an error: {str(e)}"
+        finally:
+            self._discard_speculation(speculative)
+
+    def _restore_recent_turns(self):
+        # Runs once, on the first query, so startup never waits on disk.
+        if self._restored:
+            return
+        self._restored = True
+        if not self.conversation_store or not self.restore_turns:
+            return
+        try:
+            session_id = self.conversation_store.latest_session()
+            restored = self.conversation_store.recent_turns(session_id, self.restore_turns) if session_id else []
+        except Exception as e:
+            self.log_debug(f"Conversation restore failed: {e}")
+            return
+        if restored:
+            self.memory[1:1] = restored
+            self.log_debug(f"Restored {len(restored)} messages from session {session_id}.")
+
+    def _commit_turn(self, turn_start):
+        # Only finished turns reach the store, so a restored context never ends mid tool chain.
+        if self.conversation_store:
+            self.conversation_store.append_turn(self.memory[turn_start:])
+        self._trim_memory()
+        self.summary = self._build_summary()
+
+    def _trim_memory(self):
+        # Safer memory cleanup: don't break assistant-tool-assistant chains crudely
+        if len(self.memory) > 30: # Increased threshold for safety
+            self.log_debug("Memory threshold reached. Optimizing conversation context...")
+            # Always preserve the system prompt (index 0)
+            system_prompt = self.memory[0]
+            
+            # We want to keep about 15 messages, but we MUST start with a 'user' message
+            # to satisfy OpenAI's requirement that tool responses follow assistant calls.
+            start_index = len(self.memory) - 15
+            
+            # Search forward from start_index to find the first 'user' message
+            new_start = -1
+            for i in range(start_index, len(self.memory)):
+                if self._message_get(self.memory[i], "role") == "user":
+                    new_start = i
+                    break
+            
+            if new_start != -1:
+                self.memory = [system_prompt] + self.memory[new_start:]
+                self.log_debug(f"Context optimized. New memory depth: {len(self.memory)}")
+            else:
+                # Fallback if no user message found in the last 15 (unlikely but safe)
+                self.memory = [system_prompt] + self.memory[-2:]
+                self.log_debug("Fallback context reset performed.")
 
     def _build_summary(self):
         def _clean(text):
@@ -445,3 +905,4 @@ class MavrickBrain:
 if __name__ == "__main__":
     brain = MavrickBrain()
     print(brain.get_response("Mavrick, what's the time?"))
+    brain.close()
@@ -0,0 +1,176 @@
+import datetime
+import json
+import math
+import threading
+import time
+
+from engine import command_history
+from engine.tail import iter_log_lines
+
+
+def _normalize(text):
+    # Case- and spacing-insensitive key; a trailing space is kept so "open " only matches whole words.
+    text = str(text or "").lower().lstrip()
+    trailing = " " if text[-1:].isspace() else ""
+    return " ".join(text.split()) + trailing
+
+
+def _combine(score, exponent):
+    # log2(2**score + 2**exponent) without overflowing for large timestamps.
+    if score is None:
+        return exponent
+    high, low = max(score, exponent), min(score, exponent)
+    return high + math.log2(1.0 + 2.0 ** (low - high))
+
+
+class _Node:
+    __slots__ = ("children", "top")
+
+    def __init__(self, top=None):
+        self.children = {}
+        self.top = top or []
+
+
+class _Command:
+    __slots__ = ("text", "score", "last")
+
+    def __init__(self, text):
+        self.text = text
+        self.score = None
+        self.last = 0.0
+
+
+class CommandCompleter:
+    """Prefix completion over past commands, ranked by frecency.
+
+    Each use adds 2 ** (time / half_life) to a command's score (kept in log2 form), so frequent and
+    recent commands rank first and scores never decrease. Commands live in a radix trie whose
+    nodes keep their own top `top_k` keys; because only one score changes per add and it only
+    grows, those lists stay exact and a lookup is a walk down the typed prefix.
+    """
+
+    def __init__(self, half_life_days=14, top_k=8):
+        self.half_life = max(1.0, float(half_life_days) * 86400)
+        self.top_k = max(1, int(top_k))
+        self._root = _Node()
+        self._commands = {}
+        self._lock = threading.Lock()
+
+    def add(self, text, when=None):
+        with self._lock:
+            self._add(text, time.time() if when is None else when)
+
+    def _add(self, text, moment):
+        key = _normalize(text).rstrip()
+        if not key:
+            return
+        command = self._commands.get(key)
+        if command is None:
+            command = _Command(str(text).strip())
+            self._commands[key] = command
+        if moment >= command.last:
+            # Show the spelling of the most recent use.
+            command.text = str(text).strip()
+            command.last = moment
+        command.score = _combine(command.score, moment / self.half_life)
+        self._insert(key)
+
+    def _rank(self, node, key):
+        top = node.top
+        if key in top:
+            top.remove(key)
+        score = self._commands[key].score
+        position = len(top)
+        while position > 0 and self._commands[top[position - 1]].score < score:
+            position -= 1
+        if position < self.top_k:
+            top.insert(position, key)
+            del top[self.top_k:]
+
+    def _insert(self, key):
+        node = self._root
+        self._rank(node, key)
+        index = 0
+        while index < len(key):
+            edge = node.children.get(key[index])
+            if edge is None:
+                node.children[key[index]] = [key[index:], _Node([key])]
+                return
+            label, child = edge
+            rest = key[index:]
+            common = 0
+            limit = min(len(label), len(rest))
+            while common < limit and label[common] == rest[common]:
+                common += 1
+            if common < len(label):
+                # Split the edge; the new node covers exactly the same keys as the old child.
+                middle = _Node(list(child.top))
+                middle.children[label[common]] = [label[common:], child]
+                edge[0] = label[:common]
+                edge[1] = middle
+                child = middle
+            self._rank(child, key)
+            index += common
+            node = child
+
+    def _find(self, prefix):
+        node = self._root
+        index = 0
+        while index < len(prefix):
+            edge = node.children.get(prefix[index])
+            if edge is None:
+                return None
+            label, child = edge
+            rest = prefix[index:]
+            if len(rest) <= len(label):
+                return child if label.startswith(rest) else None
+            if not rest.startswith(label):
+                return None
+            index += len(label)
+            node = child
+        return node
+
+    def suggest(self, prefix, limit=5):
+        """Return up to `limit` past commands starting with `prefix`, best first."""
+        key = _normalize(prefix)
+        if not key.strip():
+            return []
+        with self._lock:
+            node = self._find(key)
+            if node is None:
+                return []
+            matches = [self._commands[item].text for item in node.top if item != key]
+        return matches[:max(0, int(limit))]
+
+    def clear(self):
+        with self._lock:
+            self._root = _Node()
+            self._commands.clear()
+
+    def __len__(self):
+        return len(self._commands)
+
+    def load_history(self, batch_size=500):
+        """Stream every recorded command (archives included) into the index, oldest first.
+
+        Entries are added in small batches so suggestions work while loading continues.
+        """
+        batch = []
+        for line in iter_log_lines(command_history.get_history_path()):
+            try:
+                entry = json.loads(line)
+                when = datetime.datetime.fromisoformat(entry["timestamp"]).timestamp()
+                text = entry["text"]
+            except (ValueError, KeyError, TypeError):
+                continue
+            batch.append((text, when))
+            if len(batch) >= batch_size:
+                self._add_batch(batch)
+                batch = []
+        self._add_batch(batch)
+        return len(self._commands)
+
+    def _add_batch(self, batch):
+        with self._lock:
+            for text, when in batch:
+                self._add(text, when)
@@ -1,6 +1,7 @@
 import os
-import json
 from datetime import datetime
+from engine.tail import tail_jsonl
+from engine import log_writer
 
 
 def _user_data_dir():
@@ -18,43 +19,21 @@ def append_entry(text, source="voice"):
         "source": str(source),
         "text": str(text)
     }
-    try:
-        os.makedirs(_user_data_dir(), exist_ok=True)
-        with open(_history_path(), "a", encoding="utf-8") as file:
-            json.dump(entry, file, ensure_ascii=True)
-            file.write("\n")
-    except Exception:
-        pass
+    log_writer.get_writer().write(_history_path(), entry)
 
 
 def read_entries(limit=200, source=None):
-    path = _history_path()
-    if not os.path.exists(path):
-        return []
+    # The source filter is applied while scanning, so `limit` matching entries come back when they exist.
+    predicate = (lambda entry: entry.get("source") == source) if source else None
+    log_writer.get_writer().flush()
     try:
-        with open(path, "r", encoding="utf-8") as file:
-            lines = file.read().splitlines()
-        entries = []
-        for line in lines[-limit:]:
-            try:
-                entry = json.loads(line)
-            except Exception:
-                continue
-            if source and entry.get("source") != source:
-                continue
-            entries.append(entry)
-        return entries
+        return tail_jsonl(_history_path(), limit, predicate=predicate, archives=True)
     except Exception:
         return []
 
 
 def clear_entries():
-    path = _history_path()
-    if os.path.exists(path):
-        try:
-            os.remove(path)
-        except Exception:
-            pass
+    log_writer.get_writer().remove(_history_path())
 
 
 def get_history_path():
@@ -0,0 +1,186 @@
+import os
+import json
+import re
+import threading
+import uuid
+from datetime import datetime
+from engine.tail import iter_lines_reverse
+
+_SESSION_RE = re.compile(r"^[0-9]{8}-[0-9]{6}-[a-f0-9]{6}$")
+
+
+def _user_data_dir():
+    base = os.getenv("APPDATA") or os.path.expanduser("~")
+    return os.path.join(base, "MavrickAI")
+
+
+def _store_dir():
+    return os.path.join(_user_data_dir(), "conversations")
+
+
+def _parse(line):
+    try:
+        record = json.loads(line)
+    except Exception:
+        # A crash mid-append leaves at most one partial line; skip it.
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def _complete_turns(messages):
+    """Keep only whole turns: a user message through a final assistant reply, every tool call answered.
+
+    A crash mid-append can cut a turn short (e.g. an assistant tool_calls message with no tool
+    results), and the API rejects any request that contains such a chain.
+    """
+    kept = []
+    turn = []
+
+    def _finish():
+        if not turn or turn[0].get("role") != "user":
+            return
+        last = turn[-1]
+        if last.get("role") != "assistant" or last.get("tool_calls"):
+            return
+        pending = set()
+        for message in turn:
+            if message.get("role") == "assistant":
+                if pending:
+                    return
+                pending = {call.get("id") for call in message.get("tool_calls") or [] if isinstance(call, dict)}
+            elif message.get("role") == "tool":
+                if message.get("tool_call_id") not in pending:
+                    return
+                pending.discard(message.get("tool_call_id"))
+        if not pending:
+            kept.extend(turn)
+
+    for message in messages:
+        if message.get("role") == "user":
+            _finish()
+            turn = []
+        turn.append(message)
+    _finish()
+    return kept
+
+
+class ConversationStore:
+    """Append-only conversation log: one JSONL segment per session plus an index of sessions."""
+
+    def __init__(self, root=None):
+        self.root = root or _store_dir()
+        self.session_id = None
+        self._file = None
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def _index_path(self):
+        return os.path.join(self.root, "index.jsonl")
+
+    def _session_path(self, session_id):
+        return os.path.join(self.root, f"{session_id}.jsonl")
+
+    def _start_session(self):
+        os.makedirs(self.root, exist_ok=True)
+        now = datetime.now()
+        self.session_id = f"{now.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self._file = open(self._session_path(self.session_id), "a", encoding="utf-8")
+        with open(self._index_path(), "a", encoding="utf-8") as index:
+            json.dump({"session": self.session_id, "started_at": now.isoformat(timespec="seconds")}, index, ensure_ascii=True)
+            index.write("\n")
+            index.flush()
+            os.fsync(index.fileno())
+
+    def append_turn(self, messages):
+        if not messages:
+            return
+        with self._lock:
+            try:
+                if self._file is None:
+                    self._start_session()
+                timestamp = datetime.now().isoformat(timespec="seconds")
+                lines = []
+                for message in messages:
+                    self._seq += 1
+                    lines.append(json.dumps({"seq": self._seq, "ts": timestamp, "message": message}, ensure_ascii=True, default=str))
+                # One write per turn keeps a crash from splitting a turn across more than its last line.
+                self._file.write("\n".join(lines) + "\n")
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            except Exception:
+                pass
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                try:
+                    self._file.close()
+                except Exception:
+                    pass
+                self._file = None
+
+    def iter_sessions(self):
+        # Newest first, read backwards from the end of the index.
+        path = self._index_path()
+        if not os.path.exists(path):
+            return
+        for line in iter_lines_reverse(path):
+            record = _parse(line)
+            if record and _SESSION_RE.match(str(record.get("session", ""))):
+                yield record
+
+    def latest_session(self, exclude_current=True):
+        for record in self.iter_sessions():
+            if exclude_current and record["session"] == self.session_id:
+                continue
+            return record["session"]
+        return None
+
+    def iter_messages(self, session_id):
+        if not _SESSION_RE.match(str(session_id or "")):
+            return
+        path = self._session_path(session_id)
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as file:
+            for line in file:
+                record = _parse(line)
+                if record and isinstance(record.get("message"), dict):
+                    yield record["message"]
+
+    def recent_turns(self, session_id, turns):
+        # Walk backwards until `turns` user messages are collected; cost depends on N, not on history size.
+        if turns <= 0 or not _SESSION_RE.match(str(session_id or "")):
+            return []
+        path = self._session_path(session_id)
+        if not os.path.exists(path):
+            return []
+        collected = []
+        users = 0
+        for line in iter_lines_reverse(path):
+            record = _parse(line)
+            if not record or not isinstance(record.get("message"), dict):
+                continue
+            message = record["message"]
+            collected.append(message)
+            if message.get("role") == "user":
+                users += 1
+                if users >= turns:
+                    break
+        collected.reverse()
+        # Never restore a partial turn: a leading fragment or a chain cut short by a crash.
+        return _complete_turns(collected)
+
+    def search(self, text, limit=20):
+        needle = str(text or "").strip().lower()
+        if not needle:
+            return []
+        matches = []
+        for session in self.iter_sessions():
+            for message in self.iter_messages(session["session"]):
+                content = message.get("content")
+                if isinstance(content, str) and needle in content.lower():
+                    matches.append({"session": session["session"], "role": message.get("role"), "content": content})
+                    if len(matches) >= limit:
+                        return matches
+        return matches
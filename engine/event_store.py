@@ -0,0 +1,313 @@
+import bisect
+import datetime
+import gzip
+import heapq
+import json
+import os
+import re
+import threading
+from itertools import islice
+
+from engine import log_writer
+from engine.tail import iter_lines_reverse, log_segments
+
+_store = None
+_store_lock = threading.Lock()
+_TIMESTAMP = re.compile(rb'"timestamp":\s*"([^"]*)"')
+_RELATIVE_DAYS = re.compile(r"^(\d+)\s*(?:d|day|days)$")
+
+
+def _user_data_dir():
+    base = os.getenv("APPDATA") or os.path.expanduser("~")
+    return os.path.join(base, "MavrickAI")
+
+
+def _session_event(entry):
+    return entry.get("kind", ""), "", entry.get("message", "")
+
+
+def _command_event(entry):
+    return entry.get("source", ""), "", entry.get("text", "")
+
+
+def _action_event(entry):
+    return entry.get("action", ""), entry.get("status", ""), entry.get("detail", "")
+
+
+# source name -> (file name, entry -> (kind, status, text))
+SOURCES = {
+    "session": ("session.log", _session_event),
+    "command": ("command_history.jsonl", _command_event),
+    "action": ("actions.log", _action_event),
+}
+
+
+def resolve_time(value, end=False):
+    """Turn 'today', 'yesterday', 'Nd' or an ISO date/datetime into a comparable timestamp string.
+
+    Dates without a time cover the whole day, so `end=True` maps them to its last second.
+    """
+    if value in (None, ""):
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(timespec="seconds")
+    if isinstance(value, datetime.date):
+        value = value.isoformat()
+    text = str(value).strip().lower()
+    today = datetime.date.today()
+    if text == "today":
+        text = today.isoformat()
+    elif text == "yesterday":
+        text = (today - datetime.timedelta(days=1)).isoformat()
+    elif text == "now":
+        return datetime.datetime.now().isoformat(timespec="seconds")
+    else:
+        match = _RELATIVE_DAYS.match(text)
+        if match:
+            moment = datetime.datetime.now() - datetime.timedelta(days=int(match.group(1)))
+            return moment.isoformat(timespec="seconds")
+        text = text.replace(" ", "T", 1).upper()
+        try:
+            datetime.datetime.fromisoformat(text)
+        except ValueError:
+            raise ValueError(f"Unrecognized time: {value}")
+    if len(text) == 10:
+        return text + ("T23:59:59" if end else "T00:00:00")
+    return text
+
+
+def _rotation_bound(path, segment):
+    """Latest timestamp an archive can hold, from its `<name>.<YYYYMMDD-HHMMSS>` rotation stamp."""
+    if segment == path:
+        return None
+    try:
+        moment = datetime.datetime.strptime(segment[len(path) + 1:][:15], "%Y%m%d-%H%M%S")
+    except ValueError:
+        return None
+    # Stamps are truncated to the second; entries from that same second may sort after it.
+    return (moment + datetime.timedelta(seconds=1)).isoformat(timespec="seconds")
+
+
+class _SegmentIndex:
+    """Sparse index of one log segment: the timestamp and byte offset of every Nth line."""
+
+    __slots__ = ("head", "size", "points", "first", "last", "pending")
+
+    def __init__(self, head):
+        self.head = head
+        self.size = 0
+        self.points = []
+        self.first = ""
+        self.last = ""
+        self.pending = 0
+
+    def covers(self, since, until):
+        if not self.points:
+            return False
+        return not ((since and self.last < since) or (until and self.first > until))
+
+    def byte_range(self, since, until):
+        stamps = [stamp for stamp, _ in self.points]
+        start, end = 0, self.size
+        if since:
+            # The point before the first stamp >= since still precedes every matching line.
+            position = bisect.bisect_left(stamps, since)
+            start = self.points[position - 1][1] if position else 0
+        if until:
+            position = bisect.bisect_right(stamps, until)
+            if position < len(self.points):
+                end = self.points[position][1]
+        return start, end
+
+
+class EventStore:
+    """Query interface over the session, command and action logs, including rotated archives.
+
+    Each segment gets a sparse offset index (every `stride` lines) built when a query first
+    reaches it. Archives are indexed once; the live file is indexed incrementally as it grows.
+    A time-bounded query skips archives rotated before its start, only reads segments whose
+    time span overlaps the range and, within them, the byte range located by binary search,
+    relying on each log being appended in time order.
+    """
+
+    def __init__(self, root=None, stride=128):
+        self.root = root or _user_data_dir()
+        self.stride = max(1, int(stride))
+        self._indexes = {}
+        self._segment_locks = {}
+        self._lock = threading.Lock()
+
+    def path_for(self, source):
+        return os.path.join(self.root, SOURCES[source][0])
+
+    def _index_segment(self, segment):
+        compressed = segment.endswith(".gz")
+        try:
+            stat = os.stat(segment)
+        except OSError:
+            return None
+        with self._lock:
+            index = self._indexes.get(segment)
+        if compressed:
+            # Archives never change once written; key them on their size and mtime.
+            key = (stat.st_size, stat.st_mtime)
+            if index is not None and index.head == key:
+                return index
+            index = _SegmentIndex(key)
+        opener = gzip.open if compressed else open
+        with opener(segment, "rb") as file:
+            if not compressed:
+                head = file.read(64)
+                if index is None or index.head != head or stat.st_size < index.size:
+                    # New, or the live file was rotated or cleared since it was indexed.
+                    index = _SegmentIndex(head)
+            with self._lock:
+                self._indexes[segment] = index
+            file.seek(index.size)
+            offset = index.size
+            last_line = None
+            for line in file:
+                if not line.endswith(b"\n"):
+                    # A record still being written; pick it up on the next query.
+                    break
+                if line.strip():
+                    if index.pending == 0:
+                        match = _TIMESTAMP.search(line)
+                        if match:
+                            stamp = match.group(1).decode("ascii", "replace")
+                            index.points.append((stamp, offset))
+                            if not index.first:
+                                index.first = stamp
+                            index.pending = self.stride
+                    if index.pending:
+                        index.pending -= 1
+                    last_line = line
+                offset += len(line)
+            index.size = offset
+            if last_line is not None:
+                match = _TIMESTAMP.search(last_line)
+                if match:
+                    index.last = match.group(1).decode("ascii", "replace")
+        return index
+
+    def _segment_lines(self, segment, start, end, newest_first):
+        if segment.endswith(".gz"):
+            with gzip.open(segment, "rb") as file:
+                file.seek(start)
+                data = file.read(end - start)
+            lines = [line for line in data.split(b"\n") if line.strip()]
+            lines = [line.decode("utf-8", "replace").rstrip("\r") for line in lines]
+            return reversed(lines) if newest_first else iter(lines)
+        if newest_first:
+            return iter_lines_reverse(segment, start=start, end=end)
+        return self._forward_lines(segment, start, end)
+
+    @staticmethod
+    def _forward_lines(segment, start, end):
+        with open(segment, "rb") as file:
+            file.seek(start)
+            position = start
+            for line in file:
+                position += len(line)
+                if position > end:
+                    break
+                if line.strip():
+                    yield line.decode("utf-8", "replace").rstrip("\r\n")
+
+    def _segment_lock(self, segment):
+        with self._lock:
+            return self._segment_locks.setdefault(segment, threading.Lock())
+
+    def _iter_source(self, source, since, until, newest_first):
+        _, describe = SOURCES[source]
+        path = self.path_for(source)
+        segments = log_segments(path)
+        with self._lock:
+            for stale in [key for key in self._indexes if key.startswith(path) and key not in segments]:
+                del self._indexes[stale]
+                self._segment_locks.pop(stale, None)
+        if newest_first:
+            segments.reverse()
+        for segment in segments:
+            bound = _rotation_bound(path, segment)
+            if since and bound and bound < since:
+                # Nothing in this archive was written after its rotation stamp; skip it unopened.
+                continue
+            # Segments are indexed only when the merged stream reaches them: a short newest-first
+            # read never decompresses the older archives.
+            try:
+                with self._segment_lock(segment):
+                    index = self._index_segment(segment)
+                    if index is None or not index.points:
+                        continue
+                    first, last = index.first, index.last
+                    covered = index.covers(since, until)
+                    if covered:
+                        start, end = index.byte_range(since, until)
+            except (OSError, EOFError):
+                continue
+            # Logs are appended in time order, so once a segment reaches past the range the
+            # remaining ones lie wholly outside it.
+            beyond = (since and first < since) if newest_first else (until and last > until)
+            if not covered:
+                if beyond:
+                    return
+                continue
+            try:
+                lines = self._segment_lines(segment, start, end, newest_first)
+                for line in lines:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if not isinstance(entry, dict):
+                        continue
+                    timestamp = str(entry.get("timestamp", ""))
+                    if (since and timestamp < since) or (until and timestamp > until):
+                        continue
+                    kind, status, text = describe(entry)
+                    yield {"timestamp": timestamp, "source": source, "kind": str(kind), "status": str(status), "text": str(text), "entry": entry}
+            except (FileNotFoundError, EOFError, OSError):
+                # Pruned or rotated away between listing and reading.
+                continue
+            if beyond:
+                return
+
+    def iter_events(self, sources=None, since=None, until=None, kinds=None, statuses=None, text=None, newest_first=True):
+        """Stream matching events across logs, merged by timestamp (newest first by default).
+
+        `since`/`until` accept anything resolve_time() does and are inclusive. `kinds` and
+        `statuses` match case-insensitively; `text` is a case-insensitive substring.
+        """
+        log_writer.get_writer().flush()
+        since = resolve_time(since)
+        until = resolve_time(until, end=True)
+        names = [name for name in (sources or SOURCES) if name in SOURCES]
+        kinds = {str(kind).lower() for kind in kinds} if kinds else None
+        statuses = {str(status).lower() for status in statuses} if statuses else None
+        needle = str(text).lower() if text else None
+        streams = [self._iter_source(name, since, until, newest_first) for name in names]
+        merged = heapq.merge(*streams, key=lambda event: event["timestamp"], reverse=newest_first)
+        for event in merged:
+            if kinds is not None and event["kind"].lower() not in kinds:
+                continue
+            if statuses is not None and event["status"].lower() not in statuses:
+                continue
+            if needle and needle not in event["text"].lower():
+                continue
+            yield event
+
+    def query(self, limit=50, **filters):
+        return list(islice(self.iter_events(**filters), max(0, int(limit))))
+
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = EventStore()
+        return _store
+
+
+def search(limit=50, **filters):
+    return get_store().query(limit=limit, **filters)
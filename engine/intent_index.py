@@ -0,0 +1,229 @@
+import os
+import json
+import math
+import re
+import threading
+import zlib
+from datetime import datetime
+
+from engine.startup import lazy_import
+
+# Loaded when the first index is built, so a disabled semantic cache never pays for numpy.
+np = None
+
+
+def _load_numpy():
+    global np
+    if np is None:
+        try:
+            np = lazy_import("numpy")
+        except Exception:
+            np = None
+    return np
+
+# Tools whose plans can be replayed for a paraphrased query without asking the model again.
+# Read-only only: a near miss such as "volume up" vs "volume down" must never trigger a side effect.
+REPLAYABLE_TOOLS = {
+    "get_system_info", "list_protocols", "list_skills", "list_reminders", "list_notes"
+}
+
+_STOP_WORDS = {
+    "a", "an", "the", "my", "me", "i", "to", "for", "of", "on", "in", "please", "can", "could",
+    "you", "would", "will", "is", "are", "what", "whats", "show", "tell", "hey", "computer",
+    "mavrick", "maverick", "up", "it", "and", "now", "some"
+}
+
+_DIMENSIONS = 4096
+
+
+def _user_data_dir():
+    base = os.getenv("APPDATA") or os.path.expanduser("~")
+    return os.path.join(base, "MavrickAI")
+
+
+def _index_path():
+    return os.path.join(_user_data_dir(), "intent_plans.jsonl")
+
+
+def _tokens(text):
+    words = re.findall(r"[a-z0-9]+", str(text or "").lower())
+    words = [word[:-1] if len(word) > 3 and word.endswith("s") else word for word in words]
+    return [word for word in words if word not in _STOP_WORDS]
+
+
+def _features(text):
+    words = _tokens(text)
+    features = list(words)
+    features.extend(f"{a}_{b}" for a, b in zip(words, words[1:]))
+    return features
+
+
+def _bucket(feature):
+    return zlib.crc32(feature.encode("utf-8")) % _DIMENSIONS
+
+
+def _argument_words(plan):
+    groups = []
+    for step in plan:
+        for value in (step.get("arguments") or {}).values():
+            if isinstance(value, str) and _tokens(value):
+                groups.append(set(_tokens(value)))
+    return groups
+
+
+class IntentIndex:
+    """TF-IDF index over past (query, tool plan) pairs, matched by cosine similarity."""
+
+    def __init__(self, threshold=0.85, max_entries=500):
+        self.threshold = float(threshold)
+        self.max_entries = max(1, int(max_entries))
+        self.available = _load_numpy() is not None
+        self.hits = 0
+        self._lock = threading.Lock()
+        self._entries = []
+        self._doc_freq = {}
+        self._matrix = None
+        self._idf = None
+        self._dirty = True
+        if self.available:
+            self._load()
+
+    def _load(self):
+        path = _index_path()
+        if not os.path.exists(path):
+            return
+        line_count = 0
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                for line in file:
+                    line_count += 1
+                    try:
+                        record = json.loads(line)
+                    except Exception:
+                        continue
+                    self._insert(record.get("query", ""), record.get("plan", []))
+        except Exception:
+            pass
+        # Compact once superseded plans make up most of the file.
+        if line_count > 2 * max(len(self._entries), 50):
+            self._rewrite()
+
+    def _rewrite(self):
+        try:
+            os.makedirs(_user_data_dir(), exist_ok=True)
+            tmp_path = _index_path() + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                for entry in self._entries:
+                    json.dump({"query": entry["query"], "plan": entry["plan"]}, file, ensure_ascii=True)
+                    file.write("\n")
+            os.replace(tmp_path, _index_path())
+        except Exception:
+            pass
+
+    def _vector(self, text):
+        counts = {}
+        for feature in _features(text):
+            bucket = _bucket(feature)
+            counts[bucket] = counts.get(bucket, 0) + 1
+        return counts
+
+    def _insert(self, query, plan):
+        if not isinstance(plan, list) or not plan:
+            return False
+        if any(step.get("name") not in REPLAYABLE_TOOLS for step in plan):
+            return False
+        counts = self._vector(query)
+        if not counts:
+            return False
+        key = " ".join(_tokens(query))
+        for index, entry in enumerate(self._entries):
+            if entry["key"] == key:
+                for bucket in entry["buckets"]:
+                    self._doc_freq[bucket] -= 1
+                del self._entries[index]
+                break
+        self._entries.append({"key": key, "query": query, "plan": plan, "counts": counts, "buckets": set(counts)})
+        for bucket in counts:
+            self._doc_freq[bucket] = self._doc_freq.get(bucket, 0) + 1
+        if len(self._entries) > self.max_entries:
+            dropped = self._entries.pop(0)
+            for bucket in dropped["buckets"]:
+                self._doc_freq[bucket] -= 1
+        self._dirty = True
+        return True
+
+    def _ensure_matrix(self):
+        if not self._dirty:
+            return
+        total = len(self._entries)
+        idf = np.zeros(_DIMENSIONS, dtype=np.float32)
+        for bucket, freq in self._doc_freq.items():
+            if freq > 0:
+                idf[bucket] = math.log((1 + total) / (1 + freq)) + 1.0
+        matrix = np.zeros((total, _DIMENSIONS), dtype=np.float32)
+        for row, entry in enumerate(self._entries):
+            for bucket, count in entry["counts"].items():
+                matrix[row, bucket] = count * idf[bucket]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self._matrix = matrix / norms
+        self._idf = idf
+        self._dirty = False
+
+    def add(self, query, plan):
+        if not self.available:
+            return
+        with self._lock:
+            if not self._insert(query, plan):
+                return
+        record = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "query": str(query),
+            "plan": plan
+        }
+        try:
+            os.makedirs(_user_data_dir(), exist_ok=True)
+            with open(_index_path(), "a", encoding="utf-8") as file:
+                json.dump(record, file, ensure_ascii=True)
+                file.write("\n")
+        except Exception:
+            pass
+
+    def match(self, query):
+        if not self.available:
+            return None
+        with self._lock:
+            if not self._entries:
+                return None
+            self._ensure_matrix()
+            counts = self._vector(query)
+            if not counts:
+                return None
+            vector = np.zeros(_DIMENSIONS, dtype=np.float32)
+            for bucket, count in counts.items():
+                vector[bucket] = count * self._idf[bucket]
+            norm = np.linalg.norm(vector)
+            if norm == 0:
+                return None
+            scores = self._matrix @ (vector / norm)
+            best = int(np.argmax(scores))
+            score = float(scores[best])
+            entry = self._entries[best]
+        if score < self.threshold:
+            return None
+        # A paraphrase must still mention at least one word of each argument ("work" for "work mode").
+        query_words = set(_tokens(query))
+        if any(not (words & query_words) for words in _argument_words(entry["plan"])):
+            return None
+        self.hits += 1
+        return {"query": entry["query"], "plan": entry["plan"], "score": score}
+
+    def clear(self):
+        with self._lock:
+            self._entries = []
+            self._doc_freq = {}
+            self._dirty = True
+        try:
+            os.remove(_index_path())
+        except OSError:
+            pass
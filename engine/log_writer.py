@@ -0,0 +1,281 @@
+import atexit
+import datetime
+import gzip
+import json
+import os
+import shutil
+import queue
+import threading
+import time
+
+from engine.tail import log_segments
+
+_writer = None
+_writer_lock = threading.Lock()
+ROTATION_RETRY_SECONDS = 60.0
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+def _compress_segment(segment):
+    target = segment + ".gz"
+    temp = target + ".tmp"
+    with open(segment, "rb") as source, gzip.open(temp, "wb") as archive:
+        shutil.copyfileobj(source, archive)
+    os.replace(temp, target)
+    os.remove(segment)
+
+
+class JsonlWriter:
+    """Single background thread that appends JSONL records through long-lived file handles.
+
+    Callers only enqueue. Records are written in batches and flushed every `flush_interval`
+    seconds, on flush(), and at shutdown. When the queue is full, best-effort records are
+    dropped immediately, and other writers wait at most `block_timeout` before dropping.
+
+    A log is rotated once it reaches `max_bytes` or when the first write of a new day lands
+    on a file last written on an earlier day. Rotated segments are gzipped next to the live
+    file and pruned to the newest `keep_archives` within `retention_days` (0 disables a limit).
+    """
+
+    def __init__(self, max_queue=10000, flush_interval=0.5, batch_size=256, block_timeout=1.0,
+                 max_bytes=5_000_000, rotate_daily=True, keep_archives=20, retention_days=90):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.block_timeout = block_timeout
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.keep_archives = keep_archives
+        self.retention_days = retention_days
+        self.dropped = 0
+        self.rotation_failures = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._handles = {}
+        self._sizes = {}
+        self._days = {}
+        self._retry_at = {}
+        self._dirty = set()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="mavrick-log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, path, entry, best_effort=False):
+        if self._closed:
+            return False
+        line = json.dumps(entry, ensure_ascii=True) + "\n"
+        try:
+            if best_effort:
+                self._queue.put_nowait(("write", path, line))
+            else:
+                self._queue.put(("write", path, line), timeout=self.block_timeout)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _control(self, op, path=None, timeout=5.0):
+        # Control ops queue behind pending writes, so they observe everything written before them.
+        if self._closed or not self._thread.is_alive():
+            return False
+        done = threading.Event()
+        try:
+            self._queue.put((op, path, done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def flush(self, timeout=5.0):
+        return self._control("flush", timeout=timeout)
+
+    def remove(self, path, timeout=5.0):
+        return self._control("remove", path, timeout=timeout)
+
+    def close(self, timeout=5.0):
+        if self._closed:
+            return
+        self._control("stop", timeout=timeout)
+        self._closed = True
+
+    def _handle(self, path):
+        handle = self._handles.get(path)
+        if handle is not None and self._should_rotate(path):
+            self._rotate(path)
+            handle = None
+        if handle is None:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._finish_pending_archives(path)
+            try:
+                stat = os.stat(path)
+                self._sizes[path] = stat.st_size
+                self._days[path] = datetime.date.fromtimestamp(stat.st_mtime)
+            except FileNotFoundError:
+                self._sizes[path] = 0
+                self._days[path] = datetime.date.today()
+            if self._should_rotate(path):
+                self._rotate(path)
+            handle = open(path, "a", encoding="utf-8")
+            self._handles[path] = handle
+        return handle
+
+    def _should_rotate(self, path):
+        size = self._sizes.get(path, 0)
+        if size <= 0 or time.monotonic() < self._retry_at.get(path, 0.0):
+            return False
+        if self.max_bytes and size >= self.max_bytes:
+            return True
+        return self.rotate_daily and self._days.get(path) != datetime.date.today()
+
+    def _rotate(self, path):
+        self._close_handle(path)
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        prefix = f"{path}.{stamp}"
+        # Several rotations within one second get increasing counters so archives keep sorting in order.
+        taken = [segment[len(prefix):].replace(".gz", "") for segment in log_segments(path) if segment.startswith(prefix)]
+        if taken:
+            counter = max(int(suffix[1:]) if suffix else 0 for suffix in taken) + 1
+            segment = f"{prefix}-{counter}"
+        else:
+            segment = prefix
+        try:
+            # Rename first so the live file is free immediately; readers list the plain segment until it is compressed.
+            os.replace(path, segment)
+        except Exception as e:
+            # The live file is still full (e.g. locked by a reader on Windows); retry on the next write.
+            self.rotation_failures += 1
+            self._retry_at[path] = time.monotonic() + ROTATION_RETRY_SECONDS
+            print(f"Log rotation failed for {path}: {e}")
+            return
+        self._sizes[path] = 0
+        self._days[path] = datetime.date.today()
+        try:
+            _compress_segment(segment)
+        except Exception:
+            # Left as a plain segment; _finish_pending_archives retries when the log is next opened.
+            pass
+        self._prune_archives(path)
+
+    def _finish_pending_archives(self, path):
+        # Segments renamed but not compressed before a crash or forced exit.
+        for segment in log_segments(path):
+            if segment != path and not segment.endswith(".gz"):
+                try:
+                    _compress_segment(segment)
+                except Exception:
+                    pass
+
+    def _prune_archives(self, path):
+        archives = [segment for segment in log_segments(path) if segment != path]
+        doomed = []
+        if self.keep_archives and len(archives) > self.keep_archives:
+            doomed = archives[:len(archives) - self.keep_archives]
+        if self.retention_days:
+            cutoff = time.time() - self.retention_days * 86400
+            doomed += [segment for segment in archives if segment not in doomed and os.path.getmtime(segment) < cutoff]
+        for segment in doomed:
+            try:
+                os.remove(segment)
+            except Exception:
+                pass
+
+    def _flush_dirty(self):
+        for path in list(self._dirty):
+            try:
+                self._handles[path].flush()
+            except Exception:
+                pass
+        self._dirty.clear()
+
+    def _close_handle(self, path):
+        handle = self._handles.pop(path, None)
+        self._dirty.discard(path)
+        if handle is not None:
+            try:
+                handle.close()
+            except Exception:
+                pass
+
+    def _apply(self, op, path, payload):
+        if op == "write":
+            try:
+                self._handle(path).write(payload)
+                self._sizes[path] = self._sizes.get(path, 0) + len(payload)
+                self._dirty.add(path)
+            except Exception:
+                self.dropped += 1
+            return True
+        if op == "flush":
+            self._flush_dirty()
+        elif op == "remove":
+            self._close_handle(path)
+            for segment in log_segments(path):
+                try:
+                    os.remove(segment)
+                except Exception:
+                    pass
+            self._sizes.pop(path, None)
+        elif op == "stop":
+            self._flush_dirty()
+            for open_path in list(self._handles):
+                self._close_handle(open_path)
+            payload.set()
+            return False
+        payload.set()
+        return True
+
+    def _run(self):
+        last_flush = time.monotonic()
+        running = True
+        while running:
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                self._flush_dirty()
+                last_flush = time.monotonic()
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            for op, path, payload in batch:
+                if not self._apply(op, path, payload):
+                    running = False
+                    break
+            if time.monotonic() - last_flush >= self.flush_interval:
+                self._flush_dirty()
+                last_flush = time.monotonic()
+
+
+def get_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = JsonlWriter(
+                max_queue=max(100, _env_int("LOG_QUEUE_SIZE", 10000)),
+                flush_interval=max(0.05, _env_float("LOG_FLUSH_SECONDS", 0.5)),
+                max_bytes=max(0, _env_int("LOG_MAX_BYTES", 5_000_000)),
+                rotate_daily=os.getenv("LOG_ROTATE_DAILY", "True").lower() == "true",
+                keep_archives=max(0, _env_int("LOG_ARCHIVE_KEEP", 20)),
+                retention_days=max(0, _env_int("LOG_RETENTION_DAYS", 90))
+            )
+            atexit.register(_writer.close)
+        return _writer
+
+
+def close():
+    with _writer_lock:
+        writer = _writer
+    if writer is not None:
+        writer.close()
@@ -0,0 +1,298 @@
+import atexit
+import os
+import json
+import threading
+import time
+from datetime import datetime
+
+# USD per 1M tokens.
+MODEL_PRICING = {
+    "gpt-4o": {"input": 2.50, "cached_input": 1.25, "output": 10.00},
+    "gpt-4o-mini": {"input": 0.15, "cached_input": 0.075, "output": 0.60},
+    "gpt-4.1": {"input": 2.00, "cached_input": 0.50, "output": 8.00},
+    "gpt-4.1-mini": {"input": 0.40, "cached_input": 0.10, "output": 1.60},
+    "gpt-4.1-nano": {"input": 0.10, "cached_input": 0.025, "output": 0.40}
+}
+
+# USD per 1M input characters.
+TTS_PRICING = {
+    "tts-1": 15.00,
+    "tts-1-hd": 30.00
+}
+
+_ROLLUP_DIMENSIONS = ("day", "persona", "tool", "model")
+
+_meter = None
+_meter_lock = threading.Lock()
+
+
+def _user_data_dir():
+    base = os.getenv("APPDATA") or os.path.expanduser("~")
+    return os.path.join(base, "MavrickAI")
+
+
+def _metering_dir():
+    return os.path.join(_user_data_dir(), "metering")
+
+
+def get_pricing(model):
+    if model in MODEL_PRICING:
+        return MODEL_PRICING[model]
+    # Dated snapshots (e.g. gpt-4o-2024-08-06) share the base model's pricing.
+    for name in sorted(MODEL_PRICING.keys(), key=len, reverse=True):
+        if str(model).startswith(name):
+            return MODEL_PRICING[name]
+    return MODEL_PRICING["gpt-4o"]
+
+
+def llm_cost(model, prompt_tokens, cached_tokens, completion_tokens):
+    pricing = get_pricing(model)
+    uncached = max(0, prompt_tokens - cached_tokens)
+    return (uncached * pricing["input"] + cached_tokens * pricing["cached_input"] + completion_tokens * pricing["output"]) / 1_000_000
+
+
+def tts_cost(model, chars):
+    return (chars * TTS_PRICING.get(model, TTS_PRICING["tts-1"])) / 1_000_000
+
+
+def _starting_balance():
+    try:
+        return float(os.getenv("OPENAI_BALANCE", "0.0"))
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def _save_delay():
+    try:
+        return max(0.0, float(os.getenv("METERING_SAVE_DELAY", "5.0")))
+    except (ValueError, TypeError):
+        return 5.0
+
+
+def _empty_bucket():
+    return {"usd": 0.0, "calls": 0, "prompt": 0, "cached": 0, "completion": 0, "tts_chars": 0}
+
+
+class Meter:
+    """Records every billable call to a JSONL ledger and keeps persisted rollups and balance.
+
+    The append-only ledger is the source of truth and may be shared by several processes. The
+    in-memory state is only ever advanced by replaying ledger lines past `_offset`, so entries
+    written by another process are picked up as well. state.json is a snapshot of that replay
+    (with the offset it covers), saved at most once per `save_delay` seconds and on flush().
+    """
+
+    def __init__(self, root=None, starting_balance=None, save_delay=None):
+        self.root = root or _metering_dir()
+        self.persona = "mavrick"
+        self.session_cost = 0.0
+        self.save_delay = _save_delay() if save_delay is None else save_delay
+        self._lock = threading.Lock()
+        self._timer = None
+        self._dirty = False
+        self._offset = 0
+        self._state = self._load_state(_starting_balance() if starting_balance is None else starting_balance)
+
+    def _ledger_path(self):
+        return os.path.join(self.root, "ledger.jsonl")
+
+    def _state_path(self):
+        return os.path.join(self.root, "state.json")
+
+    def _load_state(self, starting_balance):
+        snapshot = None
+        try:
+            with open(self._state_path(), "r", encoding="utf-8") as file:
+                snapshot = json.load(file)
+        except (OSError, ValueError):
+            pass
+        if not isinstance(snapshot, dict):
+            snapshot = {}
+        if isinstance(snapshot.get("rollups"), dict) and isinstance(snapshot.get("offset"), int):
+            self._state = snapshot
+            self._offset = snapshot.pop("offset")
+            for dimension in _ROLLUP_DIMENSIONS:
+                self._state["rollups"].setdefault(dimension, {})
+            try:
+                if os.path.getsize(self._ledger_path()) < self._offset:
+                    # The ledger was cleared or replaced since the snapshot was taken.
+                    self._state = self._empty_state()
+                    self._offset = 0
+            except OSError:
+                self._state = self._empty_state()
+                self._offset = 0
+        else:
+            self._state = self._empty_state()
+        self._catch_up()
+        # A changed OPENAI_BALANCE means the account was topped up: spending is counted from the new figure.
+        if self._state.get("anchor") != starting_balance:
+            try:
+                self._append({"k": "anchor", "a": starting_balance})
+                self._catch_up()
+            except Exception as e:
+                print(f"Metering write failed: {e}")
+                self._state["anchor"] = starting_balance
+                self._state["spent"] = 0.0
+        return self._state
+
+    @staticmethod
+    def _empty_state():
+        return {"anchor": None, "spent": 0.0, "lifetime_usd": 0.0, "rollups": {dimension: {} for dimension in _ROLLUP_DIMENSIONS}}
+
+    def _catch_up(self):
+        # Replay ledger lines past the offset, whoever wrote them.
+        try:
+            if os.path.getsize(self._ledger_path()) <= self._offset:
+                return
+            with open(self._ledger_path(), "rb") as file:
+                file.seek(self._offset)
+                for line in file:
+                    if not line.endswith(b"\n"):
+                        # Another process is mid-append; read it next time.
+                        break
+                    self._offset += len(line)
+                    self._dirty = True
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(entry, dict):
+                        self._apply(self._state, entry)
+        except OSError:
+            pass
+
+    def _apply(self, state, entry):
+        if entry.get("k") == "anchor":
+            state["anchor"] = entry.get("a")
+            state["spent"] = 0.0
+            return
+        usd = float(entry.get("usd", 0.0))
+        state["lifetime_usd"] = state.get("lifetime_usd", 0.0) + usd
+        state["spent"] = state.get("spent", 0.0) + usd
+        tools = entry.get("tl") or ["none"]
+        keys = {
+            "day": [datetime.fromtimestamp(entry.get("t", 0)).strftime("%Y-%m-%d")],
+            "persona": [entry.get("pe") or "mavrick"],
+            "tool": tools,
+            "model": [entry.get("m") or "unknown"]
+        }
+        for dimension, names in keys.items():
+            # A call serving several tools splits its cost evenly so tool USD totals still add up;
+            # call and token counts are kept whole, so they overlap across those tools.
+            share = 1.0 / len(names)
+            for name in names:
+                bucket = state["rollups"][dimension].setdefault(name, _empty_bucket())
+                bucket["usd"] += usd * share
+                bucket["calls"] += 1
+                bucket["prompt"] += entry.get("p", 0)
+                bucket["cached"] += entry.get("c", 0)
+                bucket["completion"] += entry.get("o", 0)
+                bucket["tts_chars"] += entry.get("ch", 0)
+
+    def _append(self, entry):
+        entry.setdefault("t", round(time.time(), 3))
+        os.makedirs(self.root, exist_ok=True)
+        with open(self._ledger_path(), "a", encoding="utf-8") as file:
+            file.write(json.dumps(entry, ensure_ascii=True, separators=(",", ":")) + "\n")
+
+    def _save_state(self):
+        path = self._state_path()
+        # Per-process temp name: concurrent savers each replace state.json with a complete snapshot.
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        snapshot = dict(self._state, offset=self._offset)
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(snapshot, file, ensure_ascii=True)
+        os.replace(temp_path, path)
+        self._dirty = False
+
+    def _schedule_save(self):
+        if self.save_delay <= 0:
+            self._save_state()
+        elif self._timer is None:
+            self._timer = threading.Timer(self.save_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            try:
+                self._save_state()
+            except Exception as e:
+                print(f"Metering write failed: {e}")
+
+    def _record(self, entry):
+        entry = {key: value for key, value in entry.items() if value not in (None, 0, [], "")}
+        entry["t"] = round(time.time(), 3)
+        entry["pe"] = self.persona
+        usd = entry.get("usd", 0.0)
+        with self._lock:
+            self.session_cost += usd
+            try:
+                self._append(entry)
+                self._catch_up()
+                self._schedule_save()
+            except Exception as e:
+                print(f"Metering write failed: {e}")
+        return usd
+
+    def set_persona(self, persona):
+        self.persona = str(persona or "mavrick").strip().lower() or "mavrick"
+
+    def record_llm(self, model, prompt_tokens=0, cached_tokens=0, completion_tokens=0, latency=None, stage=None, tools=None):
+        cost = llm_cost(model, prompt_tokens, cached_tokens, completion_tokens)
+        return self._record({
+            "k": "llm",
+            "m": model,
+            "st": stage,
+            "p": int(prompt_tokens),
+            "c": int(cached_tokens),
+            "o": int(completion_tokens),
+            "ms": int(latency * 1000) if latency is not None else None,
+            "usd": round(cost, 8),
+            "tl": sorted(set(tools or []))
+        })
+
+    def record_tts(self, model, chars, latency=None):
+        cost = tts_cost(model, chars)
+        return self._record({
+            "k": "tts",
+            "m": model,
+            "ch": int(chars),
+            "ms": int(latency * 1000) if latency is not None else None,
+            "usd": round(cost, 8),
+            "tl": ["speech"]
+        })
+
+    @property
+    def balance(self):
+        with self._lock:
+            self._catch_up()
+            anchor = self._state.get("anchor") or 0.0
+            return max(0.0, anchor - self._state.get("spent", 0.0))
+
+    @property
+    def lifetime_cost(self):
+        with self._lock:
+            self._catch_up()
+            return self._state.get("lifetime_usd", 0.0)
+
+    def rollup(self, dimension):
+        if dimension not in _ROLLUP_DIMENSIONS:
+            raise ValueError(f"Unknown rollup dimension: {dimension}")
+        with self._lock:
+            self._catch_up()
+            return {name: dict(bucket) for name, bucket in self._state["rollups"][dimension].items()}
+
+
+def get_meter():
+    global _meter
+    with _meter_lock:
+        if _meter is None:
+            _meter = Meter()
+            atexit.register(_meter.flush)
+        return _meter
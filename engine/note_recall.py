@@ -0,0 +1,119 @@
+import math
+import re
+import threading
+from collections import Counter
+
+from engine import notes
+
+_STOP_WORDS = {
+    "a", "an", "the", "my", "me", "i", "to", "for", "of", "on", "in", "at", "about", "please", "can",
+    "could", "you", "would", "will", "is", "are", "was", "were", "what", "whats", "when", "where",
+    "which", "who", "did", "do", "does", "show", "tell", "find", "recall", "remember", "note", "notes",
+    "hey", "computer", "mavrick", "maverick", "it", "and", "or", "that", "this", "with", "any", "some"
+}
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _stem(word):
+    # Crude suffix folding so "meeting"/"meetings"/"meet" land on one term; good enough for short notes.
+    for suffix in ("ing", "ed", "es", "s"):
+        if len(word) > len(suffix) + 2 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def _terms(text):
+    words = re.findall(r"[a-z0-9]+", str(text or "").lower())
+    return [_stem(word) for word in words if word not in _STOP_WORDS]
+
+
+class NoteRecallIndex:
+    """In-memory BM25 index over notes, built on first use and updated on every add/delete.
+
+    Only used by notes.search_notes() when the backend has no FTS5 index (json and journal).
+    """
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._docs = {}
+        self._postings = {}
+        self._total_length = 0
+        self._built = False
+        self._lock = threading.Lock()
+
+    def _add(self, note):
+        note_id = note.get("id")
+        if not note_id:
+            return
+        self._remove(note_id)
+        counts = Counter(_terms(note.get("text", "")))
+        length = sum(counts.values())
+        self._docs[note_id] = (note, length)
+        self._total_length += length
+        for term, tf in counts.items():
+            self._postings.setdefault(term, {})[note_id] = tf
+
+    def _remove(self, note_id):
+        entry = self._docs.pop(note_id, None)
+        if entry is None:
+            return
+        note, length = entry
+        self._total_length -= length
+        for term in set(_terms(note.get("text", ""))):
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.pop(note_id, None)
+                if not posting:
+                    del self._postings[term]
+
+    def _ensure_built(self):
+        if self._built:
+            return
+        for note in notes.list_notes(limit=None):
+            self._add(note)
+        self._built = True
+
+    def on_change(self, event, payload):
+        with self._lock:
+            if not self._built:
+                return
+            if event == "add":
+                self._add(payload)
+            elif event == "delete":
+                self._remove(payload)
+            elif event == "clear":
+                self._docs.clear()
+                self._postings.clear()
+                self._total_length = 0
+
+    def search(self, query, k=5):
+        with self._lock:
+            self._ensure_built()
+            total = len(self._docs)
+            if not total:
+                return []
+            average_length = self._total_length / total or 1.0
+            scores = {}
+            for term in set(_terms(query)):
+                posting = self._postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1 + (total - len(posting) + 0.5) / (len(posting) + 0.5))
+                for note_id, tf in posting.items():
+                    length = self._docs[note_id][1]
+                    norm = tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * length / average_length))
+                    scores[note_id] = scores.get(note_id, 0.0) + idf * norm
+            ranked = sorted(scores.items(), key=lambda item: (item[1], self._docs[item[0]][0].get("created_at", "")), reverse=True)
+            return [dict(self._docs[note_id][0], score=round(score, 3)) for note_id, score in ranked[:max(1, int(k))]]
+
+
+def get_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = NoteRecallIndex()
+            notes.add_listener(_index.on_change)
+        return _index
@@ -1,7 +1,18 @@
 import os
 import json
+import re
+import sqlite3
+import sys
+import threading
 import uuid
 from datetime import datetime
+from itertools import islice
+
+_backend = None
+_backend_lock = threading.Lock()
+# Bumped on every write made by this process, so caches see changes even within one mtime tick.
+_write_count = 0
+_listeners = []
 
 
 def _user_data_dir():
@@ -13,6 +24,14 @@ def _notes_path():
     return os.path.join(_user_data_dir(), "notes.json")
 
 
+def _db_path():
+    return os.path.join(_user_data_dir(), "notes.db")
+
+
+def _journal_path():
+    return os.path.join(_user_data_dir(), "notes.journal")
+
+
 def _load_notes():
     path = _notes_path()
     if not os.path.exists(path):
@@ -29,47 +48,415 @@ def _load_notes():
 
 def _save_notes(notes):
     os.makedirs(_user_data_dir(), exist_ok=True)
-    with open(_notes_path(), "w", encoding="utf-8") as file:
+    # Write a sibling file and swap it in, so a crash never leaves a truncated notes.json.
+    temp_path = _notes_path() + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
         json.dump(notes, file, indent=2, ensure_ascii=True)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, _notes_path())
 
 
-def add_note(text):
-    text = str(text).strip()
-    if not text:
-        return "Note text is required."
-    notes = _load_notes()
-    note = {
+def _read_json_notes():
+    try:
+        with open(_notes_path(), "r", encoding="utf-8") as file:
+            data = json.load(file)
+    except Exception:
+        return []
+    return [note for note in data if isinstance(note, dict) and str(note.get("text", "")).strip()] if isinstance(data, list) else []
+
+
+def _new_note(text):
+    return {
         "id": uuid.uuid4().hex[:8],
         "text": text,
         "created_at": datetime.now().isoformat(timespec="seconds")
     }
-    notes.append(note)
-    _save_notes(notes)
+
+
+def _search_terms(query):
+    return [term for term in re.findall(r"[a-z0-9]+", str(query or "").lower()) if len(term) > 1]
+
+
+class _JsonNotes:
+    """The original single-file store; kept for NOTES_BACKEND=json."""
+
+    def add(self, note):
+        notes = _load_notes()
+        notes.append(note)
+        _save_notes(notes)
+
+    def list(self, limit):
+        notes = _load_notes()
+        notes = sorted(notes, key=lambda n: n.get("created_at", ""), reverse=True)
+        return notes[:limit]
+
+    def delete(self, note_id):
+        notes = _load_notes()
+        remaining = [note for note in notes if note.get("id") != note_id]
+        if len(remaining) == len(notes):
+            return False
+        _save_notes(remaining)
+        return True
+
+    def clear(self):
+        _save_notes([])
+
+    def path(self):
+        return _notes_path()
+
+    def file_version(self):
+        try:
+            return os.stat(_notes_path()).st_mtime_ns
+        except OSError:
+            return 0
+
+
+class _SqliteNotes:
+    """SQLite store in WAL mode with an index on created_at and an FTS5 index over note text."""
+
+    def __init__(self, path):
+        self._path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS notes (
+                id TEXT PRIMARY KEY,
+                text TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_notes_created_at ON notes(created_at);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        self.fts = self._create_fts()
+        self._migrate_json()
+
+    def _create_fts(self):
+        # Some SQLite builds lack FTS5; search then falls back to LIKE.
+        try:
+            existed = self._conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'notes_fts'").fetchone()
+            self._conn.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(text, content='notes', content_rowid='rowid');
+                CREATE TRIGGER IF NOT EXISTS notes_ai AFTER INSERT ON notes BEGIN
+                    INSERT INTO notes_fts(rowid, text) VALUES (new.rowid, new.text);
+                END;
+                CREATE TRIGGER IF NOT EXISTS notes_ad AFTER DELETE ON notes BEGIN
+                    INSERT INTO notes_fts(notes_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+                END;
+            """)
+            if not existed:
+                # Index any rows written before the full-text table existed.
+                self._conn.execute("INSERT INTO notes_fts(notes_fts) VALUES ('rebuild')")
+            return True
+        except sqlite3.Error as e:
+            print(f"Notes full-text index unavailable: {e}")
+            return False
+
+    def _migrate_json(self):
+        # One-time import of notes.json; the old file is renamed so it is never imported twice.
+        json_path = _notes_path()
+        if not os.path.exists(json_path):
+            return
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'migrated_json'").fetchone()
+            if row:
+                return
+            rows = []
+            for note in _read_json_notes():
+                rows.append((
+                    str(note.get("id") or uuid.uuid4().hex[:8]),
+                    str(note.get("text")).strip(),
+                    str(note.get("created_at") or datetime.now().isoformat(timespec="seconds"))
+                ))
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany("INSERT OR IGNORE INTO notes(id, text, created_at) VALUES (?, ?, ?)", rows)
+                self._conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES ('migrated_json', ?)", (datetime.now().isoformat(timespec="seconds"),))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        try:
+            os.replace(json_path, json_path + ".migrated")
+        except OSError:
+            pass
+        print(f"Migrated {len(rows)} notes from notes.json to notes.db.")
+
+    def _rows(self, sql, params=()):
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            return [{"id": row[0], "text": row[1], "created_at": row[2]} for row in cursor.fetchall()]
+
+    def add(self, note):
+        with self._lock:
+            self._conn.execute("INSERT INTO notes(id, text, created_at) VALUES (?, ?, ?)", (note["id"], note["text"], note["created_at"]))
+
+    def list(self, limit):
+        return self._rows("SELECT id, text, created_at FROM notes ORDER BY created_at DESC, rowid DESC LIMIT ?", (int(limit),))
+
+    def delete(self, note_id):
+        with self._lock:
+            return self._conn.execute("DELETE FROM notes WHERE id = ?", (note_id,)).rowcount > 0
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM notes")
+
+    def search(self, query, limit):
+        terms = _search_terms(query)
+        if not terms:
+            return []
+        # OR of prefix terms ranked by bm25, so spoken queries with filler words still match.
+        match = " OR ".join(f'"{term}"*' for term in terms)
+        return self._rows(
+            "SELECT notes.id, notes.text, notes.created_at FROM notes_fts "
+            "JOIN notes ON notes.rowid = notes_fts.rowid "
+            "WHERE notes_fts MATCH ? ORDER BY bm25(notes_fts) LIMIT ?",
+            (match, int(limit))
+        )
+
+    def path(self):
+        return self._path
+
+    def file_version(self):
+        versions = []
+        for path in (self._path, self._path + "-wal"):
+            try:
+                versions.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                versions.append(0)
+        return tuple(versions)
+
+
+class _JournalNotes:
+    """Append-only JSONL journal of add/del/clear records, replayed into memory at startup."""
+
+    COMPACT_RATIO = 0.5
+    COMPACT_MIN_RECORDS = 200
+
+    def __init__(self, path):
+        self._path = path
+        self._lock = threading.Lock()
+        self._notes = {}
+        self._records = 0
+        self._compacting = False
+        self._pending = None
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if not os.path.exists(path):
+            self._import_json()
+        self._replay()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _import_json(self):
+        # One-time import of notes.json, oldest first so the journal stays in creation order.
+        notes = sorted(_read_json_notes(), key=lambda n: n.get("created_at", ""))
+        if not notes:
+            return
+        self._write_snapshot(self._path, [dict(note, op="add") for note in notes])
+        try:
+            os.replace(_notes_path(), _notes_path() + ".migrated")
+        except OSError:
+            pass
+        print(f"Migrated {len(notes)} notes from notes.json to notes.journal.")
+
+    def _replay(self):
+        valid_bytes = 0
+        try:
+            with open(self._path, "rb") as file:
+                for raw in file:
+                    if not raw.endswith(b"\n"):
+                        break
+                    try:
+                        record = json.loads(raw.decode("utf-8"))
+                    except ValueError:
+                        break
+                    self._apply(record)
+                    valid_bytes += len(raw)
+                size = file.seek(0, os.SEEK_END)
+        except FileNotFoundError:
+            return
+        if size > valid_bytes:
+            # A crash mid-append left a partial record; cut it so the next append starts cleanly.
+            with open(self._path, "r+b") as file:
+                file.truncate(valid_bytes)
+
+    def _apply(self, record):
+        self._records += 1
+        op = record.get("op")
+        if op == "add" and record.get("id"):
+            self._notes[record["id"]] = {"id": record["id"], "text": record.get("text", ""), "created_at": record.get("created_at", "")}
+        elif op == "del":
+            self._notes.pop(record.get("id"), None)
+        elif op == "clear":
+            self._notes.clear()
+
+    def _append(self, record):
+        line = json.dumps(record, ensure_ascii=True) + "\n"
+        self._file.write(line)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        if self._pending is not None:
+            self._pending.append(line)
+        self._apply(record)
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        # Once most records are dead, rewrite a snapshot of live notes in the background.
+        dead = self._records - len(self._notes)
+        if self._compacting or self._records < self.COMPACT_MIN_RECORDS or dead <= self._records * self.COMPACT_RATIO:
+            return
+        self._compacting = True
+        self._pending = []
+        snapshot = [dict(note, op="add") for note in self._notes.values()]
+        threading.Thread(target=self._compact, args=(snapshot,), name="mavrick-notes-compact", daemon=True).start()
+
+    def _write_snapshot(self, path, records):
+        temp_path = path + ".compact"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            for record in records:
+                file.write(json.dumps(record, ensure_ascii=True) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+
+    def _compact(self, snapshot):
+        try:
+            # The bulk of the rewrite happens without the lock; only records appended meanwhile are copied under it.
+            temp_path = self._path + ".compact"
+            with open(temp_path, "w", encoding="utf-8") as file:
+                for record in snapshot:
+                    file.write(json.dumps(record, ensure_ascii=True) + "\n")
+            with self._lock:
+                with open(temp_path, "a", encoding="utf-8") as file:
+                    file.writelines(self._pending)
+                    file.flush()
+                    os.fsync(file.fileno())
+                self._file.close()
+                os.replace(temp_path, self._path)
+                self._file = open(self._path, "a", encoding="utf-8")
+                self._records = len(snapshot) + len(self._pending)
+        except Exception as e:
+            print(f"Notes journal compaction failed: {e}")
+        finally:
+            with self._lock:
+                self._pending = None
+                self._compacting = False
+
+    def add(self, note):
+        with self._lock:
+            self._append(dict(note, op="add"))
+
+    def list(self, limit):
+        # The journal is in creation order, so the newest notes are at the end.
+        with self._lock:
+            newest = list(islice(reversed(self._notes.values()), int(limit)))
+        return sorted(newest, key=lambda n: n.get("created_at", ""), reverse=True)
+
+    def delete(self, note_id):
+        with self._lock:
+            if note_id not in self._notes:
+                return False
+            self._append({"op": "del", "id": note_id})
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._append({"op": "clear"})
+
+    def path(self):
+        return self._path
+
+    def file_version(self):
+        try:
+            return os.stat(self._path).st_mtime_ns
+        except OSError:
+            return 0
+
+
+def _get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            name = os.getenv("NOTES_BACKEND", "sqlite").strip().lower()
+            if name == "json":
+                _backend = _JsonNotes()
+            elif name == "journal":
+                _backend = _JournalNotes(_journal_path())
+            else:
+                try:
+                    _backend = _SqliteNotes(_db_path())
+                except Exception as e:
+                    print(f"Notes database unavailable, using notes.json: {e}")
+                    _backend = _JsonNotes()
+        return _backend
+
+
+def _bump(event, payload=None):
+    global _write_count
+    _write_count += 1
+    for listener in list(_listeners):
+        try:
+            listener(event, payload)
+        except Exception as e:
+            print(f"Notes listener failed: {e}")
+
+
+def add_listener(callback):
+    # callback(event, payload): ("add", note), ("delete", note_id) or ("clear", None).
+    if callback not in _listeners:
+        _listeners.append(callback)
+
+
+def add_note(text):
+    text = str(text).strip()
+    if not text:
+        return "Note text is required."
+    note = _new_note(text)
+    _get_backend().add(note)
+    _bump("add", note)
     return f"Note saved (id: {note['id']})."
 
 
 def list_notes(limit=50):
-    notes = _load_notes()
-    notes = sorted(notes, key=lambda n: n.get("created_at", ""), reverse=True)
-    return notes[:limit]
+    # limit=None returns every note, newest first.
+    return _get_backend().list(sys.maxsize if limit is None else limit)
+
+
+def search_notes(query, limit=5):
+    try:
+        limit = max(1, min(50, int(limit)))
+    except (ValueError, TypeError):
+        limit = 5
+    backend = _get_backend()
+    if getattr(backend, "fts", False):
+        return backend.search(query, limit)
+    # json/journal backends (or SQLite built without FTS5) rank through the in-memory BM25 index.
+    from engine import note_recall
+    return note_recall.get_index().search(query, limit)
 
 
 def delete_note(note_id):
     note_id = str(note_id).strip()
     if not note_id:
         return "Note id is required."
-    notes = _load_notes()
-    remaining = [note for note in notes if note.get("id") != note_id]
-    if len(remaining) == len(notes):
+    if not _get_backend().delete(note_id):
         return f"No note found with id {note_id}."
-    _save_notes(remaining)
+    _bump("delete", note_id)
     return f"Note {note_id} deleted."
 
 
 def clear_notes():
-    _save_notes([])
+    _get_backend().clear()
+    _bump("clear")
     return "All notes cleared."
 
 
 def get_notes_path():
-    return _notes_path()
+    return _get_backend().path()
+
+
+def get_version():
+    return (_write_count, _get_backend().file_version())
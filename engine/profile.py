@@ -1,7 +1,9 @@
 import os
 import sys
+import atexit
 import json
 import shutil
+import threading
 
 _DEFAULT_PROFILE = {
     "user_name": "Sir",
@@ -62,8 +64,13 @@ def _normalize_profile(data):
 
 def _write_profile(path, profile):
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as file:
+    # Write a sibling file and swap it in, so a crash never leaves a truncated profile.json.
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
         json.dump(profile, file, indent=2, ensure_ascii=True)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
 
 def load_profile():
     path = _profile_path()
@@ -87,3 +94,73 @@ def save_profile(profile):
     path = os.path.join(_user_data_dir(), "profile.json")
     _write_profile(path, normalized)
     return normalized
+
+def _save_delay():
+    try:
+        return max(0.0, float(os.getenv("PROFILE_SAVE_DELAY", "2.0")))
+    except (ValueError, TypeError):
+        return 2.0
+
+class ProfileStore:
+    """Keeps the profile in memory and coalesces saves.
+
+    The first change after a write schedules one save `delay` seconds later; changes made in
+    the meantime ride along with it. Unchanged profiles are never rewritten, and flush() writes
+    anything pending immediately (call it on shutdown).
+    """
+
+    def __init__(self, delay=None):
+        self.delay = _save_delay() if delay is None else delay
+        self._profile = None
+        self._saved = None
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        with self._lock:
+            if self._profile is None:
+                self._profile = load_profile()
+                self._saved = dict(self._profile)
+            return dict(self._profile)
+
+    def update(self, profile):
+        normalized = _normalize_profile(profile)
+        with self._lock:
+            self._profile = normalized
+            if normalized == self._saved:
+                return dict(normalized)
+            if self.delay <= 0:
+                self._write_locked()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        return dict(normalized)
+
+    def _write_locked(self):
+        if self._profile is None or self._profile == self._saved:
+            return
+        snapshot = dict(self._profile)
+        _write_profile(os.path.join(_user_data_dir(), "profile.json"), snapshot)
+        self._saved = snapshot
+
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            try:
+                self._write_locked()
+            except Exception:
+                pass
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_profile_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ProfileStore()
+            atexit.register(_store.flush)
+        return _store
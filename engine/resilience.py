@@ -0,0 +1,148 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+
+_TRANSIENT_ERRORS = {
+    "APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError",
+    "ConnectError", "ConnectTimeout", "ReadTimeout", "ReadError", "RemoteProtocolError",
+    "PoolTimeout", "ConnectionError", "Timeout", "TimeoutError"
+}
+_TRANSIENT_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class Deadline:
+    def __init__(self, seconds=None):
+        self.expires_at = None if seconds is None else time.monotonic() + float(seconds)
+
+    @classmethod
+    def after(cls, seconds):
+        return cls(seconds)
+
+    def remaining(self, cap=None):
+        if self.expires_at is None:
+            return cap
+        left = max(0.0, self.expires_at - time.monotonic())
+        return left if cap is None else min(left, cap)
+
+    def expired(self):
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+
+class LatencyTracker:
+    def __init__(self, window=100, min_samples=10):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(float(seconds))
+
+    def percentile(self, pct):
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round((pct / 100.0) * (len(ordered) - 1))))
+        return ordered[index]
+
+
+def is_transient(exc):
+    for cls in type(exc).__mro__:
+        if cls.__name__ in _TRANSIENT_ERRORS:
+            return True
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status in _TRANSIENT_STATUS
+
+
+def backoff_delay(attempt, base=0.25, cap=4.0):
+    # Full jitter: spreads retries from concurrent callers instead of synchronising them.
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def _check_deadline(deadline):
+    if deadline is not None and deadline.expired():
+        raise DeadlineExceeded("Deadline exceeded before the request could complete.")
+    return deadline.remaining() if deadline is not None else None
+
+
+def call_with_retry(make_call, deadline=None, attempts=3, tracker=None):
+    """Run make_call(timeout) with jittered exponential retries on transient errors."""
+    last_error = None
+    for attempt in range(max(1, attempts)):
+        timeout = _check_deadline(deadline)
+        started = time.monotonic()
+        try:
+            result = make_call(timeout)
+            if tracker:
+                tracker.record(time.monotonic() - started)
+            return result
+        except Exception as exc:
+            if not is_transient(exc):
+                raise
+            last_error = exc
+        delay = backoff_delay(attempt)
+        if attempt == attempts - 1 or (deadline is not None and delay >= deadline.remaining()):
+            break
+        time.sleep(delay)
+    raise last_error
+
+
+async def _hedged(make_call, deadline, hedge_after):
+    tasks = [asyncio.ensure_future(make_call(_check_deadline(deadline)))]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+        if not done:
+            tasks.append(asyncio.ensure_future(make_call(_check_deadline(deadline))))
+        pending = set(tasks)
+        last_error = None
+        while pending:
+            timeout = deadline.remaining() if deadline is not None else None
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                raise DeadlineExceeded("Deadline exceeded while waiting for a response.")
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                last_error = task.exception()
+        raise last_error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+async def call_async(make_call, deadline=None, attempts=3, tracker=None, hedge=False):
+    """Async variant of call_with_retry; optionally hedges once the first try passes the tracked p95."""
+    last_error = None
+    for attempt in range(max(1, attempts)):
+        timeout = _check_deadline(deadline)
+        started = time.monotonic()
+        try:
+            hedge_after = tracker.percentile(95) if hedge and tracker else None
+            if hedge_after is not None:
+                result = await _hedged(make_call, deadline, hedge_after)
+            else:
+                result = await asyncio.wait_for(make_call(timeout), timeout)
+            if tracker:
+                tracker.record(time.monotonic() - started)
+            return result
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded("Deadline exceeded while waiting for a response.")
+        except Exception as exc:
+            if not is_transient(exc):
+                raise
+            last_error = exc
+        delay = backoff_delay(attempt)
+        if attempt == attempts - 1 or (deadline is not None and delay >= deadline.remaining()):
+            break
+        await asyncio.sleep(delay)
+    raise last_error
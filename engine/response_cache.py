@@ -0,0 +1,93 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Queries mentioning any of these depend on the clock, live system state or the conversation itself.
+_VOLATILE_WORDS = {
+    "time", "date", "day", "today", "tonight", "tomorrow", "yesterday", "now", "current", "currently",
+    "latest", "news", "weather", "stats", "cpu", "ram", "memory", "battery", "screen", "remind",
+    "reminder", "reminders", "open", "launch", "start", "run", "initiate", "search", "play", "pause",
+    "next", "previous", "volume", "mute", "delete", "cancel", "clear", "add", "save", "note",
+    "switch", "persona", "again", "earlier", "before", "said", "remember", "joke", "random"
+}
+
+_FILLER_PREFIXES = ("hey computer", "computer", "hey mavrick", "mavrick", "maverick", "jarvis", "friday", "please", "can you", "could you")
+
+# Tools that only read state covered by the cache's version key.
+CACHEABLE_TOOLS = {"list_protocols", "list_skills", "list_notes"}
+
+
+def normalize_query(text):
+    text = str(text or "").lower()
+    text = re.sub(r"[^a-z0-9\s]", " ", text)
+    text = " ".join(text.split())
+    changed = True
+    while changed and text:
+        changed = False
+        for prefix in _FILLER_PREFIXES:
+            if text == prefix:
+                return ""
+            if text.startswith(prefix + " "):
+                text = text[len(prefix) + 1:]
+                changed = True
+    if text.endswith(" please"):
+        text = text[:-len(" please")]
+    return text
+
+
+def is_cacheable_query(text):
+    normalized = normalize_query(text)
+    if not normalized:
+        return False
+    words = set(normalized.split())
+    return not (words & _VOLATILE_WORDS)
+
+
+class ResponseCache:
+    def __init__(self, max_entries=128, ttl_seconds=600):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, query, version):
+        return (normalize_query(query), version)
+
+    def get(self, query, version):
+        key = self._key(query, version)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            response, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return response
+
+    def put(self, query, version, response, ttl_seconds=None):
+        if not response:
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else float(ttl_seconds)
+        key = self._key(query, version)
+        with self._lock:
+            self._entries[key] = (response, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
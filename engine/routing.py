@@ -0,0 +1,64 @@
+import os
+import re
+
+_COMPLEX_PATTERNS = [
+    r"\bwhy\b", r"\bexplain\b", r"\bcompare\b", r"\banaly[sz]e\b", r"\bsummari[sz]e\b",
+    r"\bwrite\b", r"\bdraft\b", r"\bcode\b", r"\bdebug\b", r"\bplan\b", r"\bstep by step\b",
+    r"\bhow (does|do|can|would|should)\b", r"\bpros and cons\b", r"\btranslate\b", r"\bscreen\b"
+]
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+class ModelRouter:
+    def __init__(self):
+        self.enabled = os.getenv("MODEL_ROUTING", "True").lower() == "true"
+        self.main_model = os.getenv("MAIN_MODEL", "gpt-4o").strip() or "gpt-4o"
+        self.fast_model = os.getenv("FAST_MODEL", "gpt-4o-mini").strip() or "gpt-4o-mini"
+        self.synthesis_model = os.getenv("SYNTHESIS_MODEL", "").strip() or self.fast_model
+        self.simple_max_words = _env_int("ROUTING_SIMPLE_MAX_WORDS", 14)
+        self.synthesis_max_chars = _env_int("ROUTING_SYNTHESIS_MAX_CHARS", 1500)
+        self.low_balance = _env_float("ROUTING_LOW_BALANCE", 0.50)
+        self._complex_re = re.compile("|".join(_COMPLEX_PATTERNS), re.IGNORECASE)
+
+    def is_complex(self, text):
+        text = str(text or "").strip()
+        if not text:
+            return False
+        if len(text.split()) > self.simple_max_words:
+            return True
+        if text.count("?") > 1:
+            return True
+        return bool(self._complex_re.search(text))
+
+    def route_query(self, text, balance=None):
+        if not self.enabled:
+            return self.main_model
+        if balance is not None and balance < self.low_balance:
+            return self.fast_model
+        if self.is_complex(text):
+            return self.main_model
+        return self.fast_model
+
+    def route_synthesis(self, query_model, tool_results, balance=None):
+        # The second call only phrases tool output; the fast model is enough unless the output is large.
+        if not self.enabled:
+            return self.main_model
+        if balance is not None and balance < self.low_balance:
+            return self.fast_model
+        total_chars = sum(len(str(result)) for result in tool_results)
+        if total_chars > self.synthesis_max_chars:
+            return query_model
+        return self.synthesis_model
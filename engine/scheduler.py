@@ -15,6 +15,7 @@ class ReminderScheduler:
         self._stop_event = threading.Event()
         self._thread = None
         self._reminders = []
+        self._version = 0
         self._load_reminders()
 
     def start(self):
@@ -54,6 +55,9 @@ class ReminderScheduler:
 
         return f"Reminder set for {due_at.strftime('%Y-%m-%d %H:%M')} (id: {reminder['id']})."
 
+    def get_version(self):
+        return self._version
+
     def list_reminders(self):
         with self._lock:
             upcoming = sorted(self._reminders, key=lambda r: r.get("due_at", ""))
@@ -154,6 +158,7 @@ class ReminderScheduler:
         path = _ensure_reminders_file()
         with self._lock:
             _save_reminders_to(path, self._reminders)
+            self._version += 1
 
 
 def _app_base_dir():
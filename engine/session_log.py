@@ -1,6 +1,7 @@
 import os
-import json
 from datetime import datetime
+from engine.tail import tail_jsonl
+from engine import log_writer
 
 
 def _user_data_dir():
@@ -18,40 +19,20 @@ def append_entry(message, kind="log"):
         "kind": str(kind),
         "message": str(message)
     }
-    try:
-        os.makedirs(_user_data_dir(), exist_ok=True)
-        with open(_log_path(), "a", encoding="utf-8") as file:
-            json.dump(entry, file, ensure_ascii=True)
-            file.write("\n")
-    except Exception:
-        pass
+    # HUD lines are best-effort: the Tk thread never waits on a full queue.
+    log_writer.get_writer().write(_log_path(), entry, best_effort=True)
 
 
 def read_entries(limit=200):
-    path = _log_path()
-    if not os.path.exists(path):
-        return []
+    log_writer.get_writer().flush()
     try:
-        with open(path, "r", encoding="utf-8") as file:
-            lines = file.read().splitlines()
-        entries = []
-        for line in lines[-limit:]:
-            try:
-                entries.append(json.loads(line))
-            except Exception:
-                entries.append({"timestamp": "", "kind": "raw", "message": line})
-        return entries
+        return tail_jsonl(_log_path(), limit, on_invalid=lambda line: {"timestamp": "", "kind": "raw", "message": line}, archives=True)
     except Exception:
         return []
 
 
 def clear_entries():
-    path = _log_path()
-    if os.path.exists(path):
-        try:
-            os.remove(path)
-        except Exception:
-            pass
+    log_writer.get_writer().remove(_log_path())
 
 
 def get_log_path():
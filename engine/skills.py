@@ -14,9 +14,35 @@ class SkillManager:
     def load_skills(self):
         self.skills = {}
         self.errors = []
+        self._stamp = self._file_stamp()
         for root in self._skill_roots():
             self._load_skills_from_root(root)
 
+    def changed(self):
+        """True once a skill folder, manifest or module has changed on disk since the last load."""
+        return self._file_stamp() != self._stamp
+
+    def _file_stamp(self):
+        stamp = []
+        for root in self._skill_roots():
+            try:
+                entries = sorted(os.listdir(root))
+            except OSError:
+                continue
+            for entry in entries:
+                skill_dir = os.path.join(root, entry)
+                try:
+                    files = sorted(name for name in os.listdir(skill_dir) if name == "skill.json" or name.endswith(".py"))
+                except OSError:
+                    continue
+                for name in files:
+                    try:
+                        stat = os.stat(os.path.join(skill_dir, name))
+                    except OSError:
+                        continue
+                    stamp.append((skill_dir, name, stat.st_mtime_ns, stat.st_size))
+        return stamp
+
     def list_skills(self):
         return sorted(self.skills.keys())
 
@@ -116,11 +142,16 @@ class SkillManager:
         if not handler:
             return None
 
+        cache_ttl = manifest.get("cache_ttl") if isinstance(manifest, dict) else None
+        if not isinstance(cache_ttl, (int, float)) or isinstance(cache_ttl, bool) or cache_ttl <= 0:
+            cache_ttl = None
+
         return {
             "name": name,
             "description": description,
             "parameters": parameters,
             "handler": handler,
+            "cache_ttl": cache_ttl,
             "path": skill_dir
         }
 
@@ -0,0 +1,25 @@
+import json
+import re
+
+# (tool, arguments, patterns). Only cheap, read-only tools belong here: a wrong guess must cost nothing.
+_RULES = [
+    ("get_system_info", {"category": "stats"}, [r"\bstats?\b", r"\bcpu\b", r"\bram\b", r"\bbattery\b", r"\bsystem (status|health|load)\b"]),
+    ("list_reminders", {}, [r"\breminders?\b", r"\bupcoming\b", r"\bscheduled?\b"]),
+    ("list_protocols", {}, [r"\bprotocols?\b", r"\bmodes?\b"]),
+    ("list_notes", {}, [r"\bnotes?\b"])
+]
+
+_COMPILED = [(name, args, re.compile("|".join(patterns), re.IGNORECASE)) for name, args, patterns in _RULES]
+
+
+def tool_key(name, args):
+    return f"{name}:{json.dumps(args or {}, sort_keys=True)}"
+
+
+def predict_tools(query):
+    text = str(query or "")
+    predictions = []
+    for name, args, pattern in _COMPILED:
+        if pattern.search(text):
+            predictions.append((name, dict(args)))
+    return predictions
@@ -0,0 +1,109 @@
+import builtins
+import importlib
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """Records import and init timings from process start until the assistant is ready."""
+
+    def __init__(self):
+        self.enabled = os.getenv("STARTUP_PROFILE", "False").lower() == "true"
+        self._origin = time.perf_counter()
+        self._records = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="mavrick-init")
+        self._original_import = None
+        self._import_depth = threading.local()
+        self._reported = False
+
+    def _add(self, kind, label, seconds):
+        with self._lock:
+            self._records.append((kind, label, seconds, time.perf_counter() - self._origin))
+
+    @contextmanager
+    def measure(self, label, kind="init"):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add(kind, label, time.perf_counter() - started)
+
+    def mark(self, label):
+        # Milestone measured from process start rather than as a duration.
+        self._add("mark", label, time.perf_counter() - self._origin)
+
+    def import_module(self, name):
+        # Deferred imports go through here so their cost shows up under "import" when first used.
+        module = sys.modules.get(name)
+        if module is not None:
+            return module
+        with self.measure(name, kind="import"):
+            return importlib.import_module(name)
+
+    def start(self, label, func, *args, **kwargs):
+        # Runs an initializer on the init pool and returns a future that resolves when it is ready.
+        def _run():
+            with self.measure(label):
+                return func(*args, **kwargs)
+        return self._executor.submit(_run)
+
+    def install_import_hook(self):
+        # Times top-level imports (inclusive of whatever they pull in) while profiling is enabled.
+        if not self.enabled or self._original_import is not None:
+            return
+        original = builtins.__import__
+        self._original_import = original
+
+        def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            depth = getattr(self._import_depth, "value", 0)
+            if level or depth or name in sys.modules:
+                self._import_depth.value = depth + 1
+                try:
+                    return original(name, globals, locals, fromlist, level)
+                finally:
+                    self._import_depth.value = depth
+            self._import_depth.value = 1
+            started = time.perf_counter()
+            try:
+                return original(name, globals, locals, fromlist, level)
+            finally:
+                self._import_depth.value = 0
+                self._add("import", name, time.perf_counter() - started)
+
+        builtins.__import__ = _timed_import
+
+    def uninstall_import_hook(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def report(self):
+        with self._lock:
+            records = list(self._records)
+        lines = ["Startup profile (ms):"]
+        for kind in ("import", "init", "mark"):
+            entries = [record for record in records if record[0] == kind]
+            if kind != "mark":
+                entries.sort(key=lambda record: record[2], reverse=True)
+            for _, label, seconds, at in entries:
+                lines.append(f"  {kind:<6} {label:<32} {seconds * 1000:8.1f}  (done at {at * 1000:.0f})")
+        return "\n".join(lines)
+
+    def finish(self):
+        # Prints once, then stops timing imports so the hook costs nothing after boot.
+        self.uninstall_import_hook()
+        if self.enabled and not self._reported:
+            self._reported = True
+            print(self.report())
+
+
+profiler = StartupProfiler()
+
+
+def lazy_import(name):
+    return profiler.import_module(name)
@@ -0,0 +1,126 @@
+import gzip
+import json
+import os
+import re
+
+
+def iter_lines_reverse(path, block_size=8192, start=0, end=None):
+    """Yield the non-empty lines of a file from last to first, reading backwards in blocks.
+
+    `start` and `end` limit the scan to a byte range whose edges fall on line boundaries.
+    """
+    with open(path, "rb") as file:
+        file.seek(0, os.SEEK_END)
+        position = file.tell() if end is None else min(end, file.tell())
+        remainder = b""
+        while position > start:
+            step = min(block_size, position - start)
+            position -= step
+            file.seek(position)
+            chunk = file.read(step) + remainder
+            lines = chunk.split(b"\n")
+            # The first piece may be the end of a line that starts in an earlier block.
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                if line.strip():
+                    yield line.decode("utf-8", "replace").rstrip("\r")
+        if remainder.strip():
+            yield remainder.decode("utf-8", "replace").rstrip("\r")
+
+
+def log_segments(path):
+    """Return the archived segments of a rotated log (oldest first) followed by the live file.
+
+    Archives sit next to the live file as `<name>.<YYYYMMDD-HHMMSS>[-N].gz`. A rotated segment
+    whose compression was interrupted is listed uncompressed until the writer finishes it.
+    """
+    folder = os.path.dirname(path) or "."
+    name = os.path.basename(path)
+    pattern = re.compile(re.escape(name) + r"\.(\d{8}-\d{6}(?:-\d+)?)(\.gz)?$")
+    archives = {}
+    try:
+        listing = os.listdir(folder)
+    except OSError:
+        listing = []
+    for entry in listing:
+        match = pattern.match(entry)
+        if not match:
+            continue
+        stamp = match.group(1)
+        # Prefer the compressed copy if both exist.
+        if match.group(2) or stamp not in archives:
+            archives[stamp] = os.path.join(folder, entry)
+    segments = [archives[stamp] for stamp in sorted(archives, key=_stamp_key)]
+    if os.path.exists(path):
+        segments.append(path)
+    return segments
+
+
+def _stamp_key(stamp):
+    day, clock, *counter = stamp.split("-")
+    return day, clock, int(counter[0]) if counter else 0
+
+
+def _segment_lines_reverse(segment):
+    if segment.endswith(".gz"):
+        # Archives are bounded by the rotation size, so one is decompressed at a time.
+        with gzip.open(segment, "rt", encoding="utf-8", errors="replace") as file:
+            lines = [line.rstrip("\r\n") for line in file if line.strip()]
+        return reversed(lines)
+    return iter_lines_reverse(segment)
+
+
+def iter_log_lines_reverse(path):
+    """Yield non-empty lines from the live log and then its archives, newest first."""
+    for segment in reversed(log_segments(path)):
+        try:
+            yield from _segment_lines_reverse(segment)
+        except (FileNotFoundError, EOFError, OSError):
+            # Rotated or pruned while reading; a truncated archive yields what it can.
+            continue
+
+
+def iter_log_lines(path):
+    """Yield non-empty lines from the oldest archive through the live log, streaming each segment."""
+    for segment in log_segments(path):
+        opener = gzip.open if segment.endswith(".gz") else open
+        try:
+            with opener(segment, "rt", encoding="utf-8", errors="replace") as file:
+                for line in file:
+                    if line.strip():
+                        yield line.rstrip("\r\n")
+        except (FileNotFoundError, EOFError, OSError):
+            continue
+
+
+def tail_jsonl(path, limit, predicate=None, on_invalid=None, archives=False):
+    """Return up to `limit` parsed entries from the end of a JSONL file, oldest first.
+
+    Only as much of the file as needed is read. `predicate` filters entries and scanning
+    continues until `limit` matches are found; `on_invalid(line)` may turn an unparsable
+    line into an entry (return None to skip it). With `archives`, scanning continues into
+    rotated segments once the live file is exhausted.
+    """
+    if limit <= 0:
+        return []
+    if archives:
+        lines = iter_log_lines_reverse(path)
+    elif os.path.exists(path):
+        lines = iter_lines_reverse(path)
+    else:
+        return []
+    entries = []
+    for line in lines:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            entry = None
+        if not isinstance(entry, dict):
+            entry = on_invalid(line) if on_invalid else None
+        if entry is None or (predicate and not predicate(entry)):
+            continue
+        entries.append(entry)
+        if len(entries) >= limit:
+            break
+    entries.reverse()
+    return entries
@@ -0,0 +1,97 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+class ToolCache:
+    """Memoizes tool results per (tool, arguments) under a declared TTL and/or version key."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max(1, int(max_entries))
+        self._policies = {}
+        self._groups = {}
+        self._entries = OrderedDict()
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def declare(self, name, ttl=None, version=None, groups=None):
+        # ttl: seconds a result stays fresh; version: callable whose return value changes when the
+        # underlying state does; groups: invalidation counters bumped by write tools.
+        if ttl is None and version is None and not groups:
+            return
+        self._policies[name] = {"ttl": ttl, "version": version, "groups": tuple(groups or ())}
+
+    def forget(self, name):
+        self._policies.pop(name, None)
+        self.invalidate(name)
+
+    def bump(self, group):
+        with self._lock:
+            self._groups[group] = self._groups.get(group, 0) + 1
+
+    def invalidate(self, name=None):
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] == name]:
+                del self._entries[key]
+
+    def invalidate_where(self, predicate):
+        # Drops entries whose cached value matches, e.g. results that point at a deleted spill file.
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if predicate(entry[0])]:
+                del self._entries[key]
+
+    def _version_of(self, policy):
+        version = None
+        if policy["version"]:
+            try:
+                version = policy["version"]()
+            except Exception:
+                return object()
+        groups = tuple(self._groups.get(group, 0) for group in policy["groups"])
+        return (version, groups)
+
+    def _record(self, name, hit):
+        stats = self._stats.setdefault(name, {"hits": 0, "misses": 0})
+        stats["hits" if hit else "misses"] += 1
+
+    def call(self, name, args, func):
+        policy = self._policies.get(name)
+        if policy is None:
+            return func(name, args)
+        try:
+            key = (name, json.dumps(args or {}, sort_keys=True, default=str))
+        except Exception:
+            return func(name, args)
+
+        version = self._version_of(policy)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, entry_version, expires_at = entry
+                if entry_version == version and (expires_at is None or expires_at > now):
+                    self._entries.move_to_end(key)
+                    self._record(name, True)
+                    return value
+                del self._entries[key]
+            self._record(name, False)
+
+        value = func(name, args)
+        expires_at = now + policy["ttl"] if policy["ttl"] is not None else None
+        with self._lock:
+            self._entries[key] = (value, version, expires_at)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def stats(self):
+        with self._lock:
+            report = {}
+            for name, stats in self._stats.items():
+                total = stats["hits"] + stats["misses"]
+                report[name] = dict(stats, hit_rate=(stats["hits"] / total) if total else 0.0)
+            return report
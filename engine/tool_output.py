@@ -0,0 +1,133 @@
+import os
+import re
+import threading
+import uuid
+
+_HANDLE_RE = re.compile(r"^[a-f0-9]{10}$")
+
+
+def _user_data_dir():
+    base = os.getenv("APPDATA") or os.path.expanduser("~")
+    return os.path.join(base, "MavrickAI")
+
+
+def _spill_dir():
+    return os.path.join(_user_data_dir(), "tool_outputs")
+
+
+def estimate_tokens(text):
+    # ~4 characters per token for English text; good enough for budgeting.
+    return max(1, (len(str(text)) + 3) // 4) if text else 0
+
+
+def _cut_head(text, limit):
+    head = text[:limit]
+    newline = head.rfind("\n")
+    return head[:newline] if newline > limit // 2 else head
+
+
+def _cut_tail(text, limit):
+    tail = text[-limit:] if limit > 0 else ""
+    newline = tail.find("\n")
+    return tail[newline + 1:] if 0 <= newline < len(tail) // 2 else tail
+
+
+class ToolOutputGovernor:
+    def __init__(self, default_budget=2000, page_chars=2000, budgets=None, keep_files=50, on_prune=None):
+        self.default_budget = max(200, int(default_budget))
+        self.page_chars = max(200, int(page_chars))
+        self.budgets = dict(budgets or {})
+        self.keep_files = keep_files
+        # on_prune(handles) is told which spilled outputs were deleted, so cached results naming them can go too.
+        self.on_prune = on_prune
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def budget_for(self, name):
+        return self.budgets.get(name, self.default_budget)
+
+    def _record(self, name, raw_text, kept_text, spilled):
+        with self._lock:
+            stats = self._stats.setdefault(name, {"calls": 0, "raw_tokens": 0, "kept_tokens": 0, "spilled": 0})
+            stats["calls"] += 1
+            stats["raw_tokens"] += estimate_tokens(raw_text)
+            stats["kept_tokens"] += estimate_tokens(kept_text)
+            stats["spilled"] += 1 if spilled else 0
+
+    def govern(self, name, text):
+        text = "" if text is None else str(text)
+        budget = self.budget_for(name)
+        if len(text) <= budget:
+            self._record(name, text, text, False)
+            return text
+
+        handle = self._spill(text)
+        pages = (len(text) + self.page_chars - 1) // self.page_chars
+        if handle:
+            notice = (f"\n...[{len(text)} chars total, truncated. Full output saved as handle '{handle}' "
+                      f"({pages} pages); call read_tool_output with this handle and a page number to read more.]...\n")
+        else:
+            notice = f"\n...[{len(text)} chars total, truncated.]...\n"
+        room = max(0, budget - len(notice))
+        head = _cut_head(text, int(room * 0.75))
+        tail = _cut_tail(text, room - len(head))
+        governed = head + notice + tail
+        self._record(name, text, governed, bool(handle))
+        return governed
+
+    def _spill(self, text):
+        try:
+            os.makedirs(_spill_dir(), exist_ok=True)
+            handle = uuid.uuid4().hex[:10]
+            with open(os.path.join(_spill_dir(), f"{handle}.txt"), "w", encoding="utf-8") as file:
+                file.write(text)
+            self._prune()
+            return handle
+        except Exception:
+            return ""
+
+    def _prune(self):
+        try:
+            paths = [os.path.join(_spill_dir(), name) for name in os.listdir(_spill_dir()) if name.endswith(".txt")]
+        except OSError:
+            return
+        if len(paths) <= self.keep_files:
+            return
+        paths.sort(key=lambda path: os.path.getmtime(path))
+        removed = []
+        for path in paths[:-self.keep_files]:
+            try:
+                os.remove(path)
+                removed.append(os.path.basename(path)[:-len(".txt")])
+            except OSError:
+                pass
+        if removed and self.on_prune:
+            try:
+                self.on_prune(removed)
+            except Exception:
+                pass
+
+    def read_page(self, handle, page=1):
+        handle = str(handle or "").strip().lower()
+        if not _HANDLE_RE.match(handle):
+            return "Invalid output handle."
+        path = os.path.join(_spill_dir(), f"{handle}.txt")
+        try:
+            page = max(1, int(page))
+        except (ValueError, TypeError):
+            page = 1
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                # Text files cannot seek to character offsets, so read up to the end of the page.
+                content = file.read(page * self.page_chars + 1)
+        except OSError:
+            return f"No saved output found for handle {handle}."
+        chunk = content[(page - 1) * self.page_chars:page * self.page_chars]
+        if not chunk:
+            return f"Handle {handle} has no page {page}."
+        more = " (more pages follow)" if len(content) > page * self.page_chars else " (last page)"
+        return f"[{handle} page {page}{more}]\n{chunk}"
+
+    def stats(self):
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
@@ -0,0 +1,151 @@
+import asyncio
+import os
+import threading
+import importlib.util
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+OPENAI_BASE_URL = "https://api.openai.com/v1"
+
+_LOCK = threading.Lock()
+_HTTP_CLIENT = None
+_SESSION = None
+_OPENAI_CLIENT = None
+# event loop -> (httpx.AsyncClient, AsyncOpenAI); async clients cannot be shared across loops.
+_ASYNC_CLIENTS = {}
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+def http2_available():
+    return importlib.util.find_spec("h2") is not None
+
+
+def _limits():
+    return httpx.Limits(
+        max_connections=_env_int("HTTP_MAX_CONNECTIONS", 20),
+        max_keepalive_connections=_env_int("HTTP_MAX_KEEPALIVE", 10),
+        keepalive_expiry=_env_float("HTTP_KEEPALIVE_SECONDS", 120.0)
+    )
+
+
+def _timeout():
+    return httpx.Timeout(_env_float("HTTP_TIMEOUT", 60.0), connect=_env_float("HTTP_CONNECT_TIMEOUT", 5.0))
+
+
+def get_http_client():
+    global _HTTP_CLIENT
+    with _LOCK:
+        if _HTTP_CLIENT is None:
+            _HTTP_CLIENT = httpx.Client(http2=http2_available(), limits=_limits(), timeout=_timeout())
+        return _HTTP_CLIENT
+
+
+def _async_clients(loop):
+    # httpx.AsyncClient is tied to the loop that first uses it, so each loop gets its own pool.
+    from openai import AsyncOpenAI
+    loop = loop or asyncio.get_running_loop()
+    with _LOCK:
+        clients = _ASYNC_CLIENTS.get(loop)
+        if clients is None:
+            http_client = httpx.AsyncClient(http2=http2_available(), limits=_limits(), timeout=_timeout())
+            # resilience.py owns retries and the deadline; SDK retries underneath would multiply attempts.
+            openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=http_client, max_retries=0)
+            clients = (http_client, openai_client)
+            _ASYNC_CLIENTS[loop] = clients
+        return clients
+
+
+def get_async_http_client(loop=None):
+    return _async_clients(loop)[0]
+
+
+def get_session():
+    global _SESSION
+    with _LOCK:
+        if _SESSION is None:
+            session = requests.Session()
+            pool_size = _env_int("HTTP_MAX_KEEPALIVE", 10)
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _SESSION = session
+        return _SESSION
+
+
+def get_openai_client():
+    global _OPENAI_CLIENT
+    from openai import OpenAI
+    http_client = get_http_client()
+    with _LOCK:
+        if _OPENAI_CLIENT is None:
+            # resilience.py owns retries and the deadline; SDK retries underneath would multiply attempts.
+            _OPENAI_CLIENT = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=http_client, max_retries=0)
+        return _OPENAI_CLIENT
+
+
+def get_async_openai_client(loop=None):
+    # `loop` defaults to the running loop; pass it explicitly when building a client for another thread's loop.
+    return _async_clients(loop)[1]
+
+
+def warm_up(urls=None):
+    # Any response means the TCP/TLS connection is now pooled; the status code does not matter.
+    warmed = []
+    try:
+        get_http_client().head(OPENAI_BASE_URL)
+        warmed.append(OPENAI_BASE_URL)
+    except Exception:
+        pass
+    for url in urls or []:
+        try:
+            get_session().head(url, timeout=5)
+            warmed.append(url)
+        except Exception:
+            pass
+    return warmed
+
+
+async def warm_up_async():
+    try:
+        await get_async_http_client().head(OPENAI_BASE_URL)
+        return True
+    except Exception:
+        return False
+
+
+async def aclose():
+    # Closes only the clients of the calling loop; other loops keep theirs.
+    with _LOCK:
+        clients = _ASYNC_CLIENTS.pop(asyncio.get_running_loop(), None)
+    if clients is not None:
+        await clients[0].aclose()
+
+
+def close():
+    global _HTTP_CLIENT, _SESSION, _OPENAI_CLIENT
+    with _LOCK:
+        client, session = _HTTP_CLIENT, _SESSION
+        _HTTP_CLIENT = None
+        _SESSION = None
+        _OPENAI_CLIENT = None
+    for resource in (client, session):
+        if resource is not None:
+            try:
+                resource.close()
+            except Exception:
+                pass
@@ -2,15 +2,26 @@ import os
 import sys
 from datetime import datetime
 
-try:
-    from PIL import ImageGrab
-except Exception:
-    ImageGrab = None
+from engine.startup import lazy_import
 
-try:
-    import pytesseract
-except Exception:
-    pytesseract = None
+# PIL and pytesseract are only needed for screen tools; load them on first use.
+_UNLOADED = object()
+ImageGrab = _UNLOADED
+pytesseract = _UNLOADED
+
+
+def _load_capture_modules():
+    global ImageGrab, pytesseract
+    if ImageGrab is _UNLOADED:
+        try:
+            ImageGrab = lazy_import("PIL.ImageGrab")
+        except Exception:
+            ImageGrab = None
+    if pytesseract is _UNLOADED:
+        try:
+            pytesseract = lazy_import("pytesseract")
+        except Exception:
+            pytesseract = None
 
 
 def _app_base_dir():
@@ -50,6 +61,7 @@ def _coerce_region(region):
 
 
 def capture_screen(region=None, save=False):
+    _load_capture_modules()
     if ImageGrab is None:
         return None, "", "Error: Screen capture is unavailable."
 
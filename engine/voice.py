@@ -1,13 +1,16 @@
 import os
+import hashlib
 import speech_recognition as sr
-from openai import OpenAI
 from dotenv import load_dotenv
-import pygame
 import tempfile
 import threading
 import time
 import json
 import sys
+from engine import transport
+from engine.resilience import Deadline, call_with_retry
+from engine.metering import get_meter
+from engine.startup import lazy_import
 
 try:
     import pyttsx3
@@ -21,6 +24,13 @@ except Exception:
 
 load_dotenv(override=True)
 
+TTS_CACHE_MAX_FILES = 64
+
+
+def _tts_cache_dir():
+    base = os.getenv("APPDATA") or os.path.expanduser("~")
+    return os.path.join(base, "MavrickAI", "tts_cache")
+
 class VoiceEngine:
     def __init__(self, user_name=None, voice=None, persona=None, wake_words=None):
         self.stop_listening = None
@@ -30,9 +40,10 @@ class VoiceEngine:
         else:
             print("OpenAI API Key detected.")
             
-        self.client = OpenAI(api_key=api_key)
+        self.client = transport.get_openai_client()
         self.user_name = user_name or os.getenv("USER_NAME", "Sir")
         self.persona = (persona or "mavrick").lower()
+        get_meter().set_persona(self.persona)
         self.voice = voice or self._voice_for_persona(self.persona)
         voice_value = str(voice).strip().lower() if voice else ""
         self.voice_override = bool(voice_value and voice_value != self._voice_for_persona(self.persona))
@@ -43,10 +54,15 @@ class VoiceEngine:
         self.wake_words = self._normalize_wake_words(wake_words)
         self.offline_tts = os.getenv("OFFLINE_TTS", "False").lower() == "true"
         self.offline_stt = os.getenv("OFFLINE_STT", "False").lower() == "true"
+        try:
+            self.tts_deadline = float(os.getenv("TTS_DEADLINE_SECONDS", "15"))
+        except (ValueError, TypeError):
+            self.tts_deadline = 15.0
         self._tts_engine = None
         self._system_voice_id = None
         self._system_voice_checked = False
         self._vosk_model = None
+        self._vosk_lock = threading.Lock()
         self._vosk_model_path = self._resolve_vosk_path()
         if self._vosk_model_path:
             self.offline_stt = True
@@ -56,21 +72,10 @@ class VoiceEngine:
         self.recognizer.dynamic_energy_threshold = True
         self.recognizer.pause_threshold = 0.8
         
-        # Initialize pygame mixer
-        try:
-            pygame.mixer.quit() # Reset if needed
-            pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
-        except Exception as e:
-            print(f"Mixer Init Error: {e}")
-            pygame.mixer.init()
-
-        # Load UI sounds
+        # pygame, the mixer and the UI sounds are set up on first playback, not at startup.
+        self._pygame = None
+        self._mixer_lock = threading.Lock()
         self.ui_sounds = {}
-        sound_files = ["wake", "think", "listen"]
-        for s in sound_files:
-            path = f"assets/{s}.wav"
-            if os.path.exists(path):
-                self.ui_sounds[s] = pygame.mixer.Sound(path)
 
     def log_debug(self, msg):
         if self.debug_mode:
@@ -91,13 +96,16 @@ class VoiceEngine:
     def _ensure_vosk_model(self):
         if self._vosk_model or not self._vosk_model_path or not vosk:
             return self._vosk_model is not None
-        try:
-            self._vosk_model = vosk.Model(self._vosk_model_path)
-            return True
-        except Exception as exc:
-            self.log_debug(f"Vosk model load failed: {exc}")
-            self._vosk_model = None
-            return False
+        with self._vosk_lock:
+            if self._vosk_model:
+                return True
+            try:
+                self._vosk_model = vosk.Model(self._vosk_model_path)
+                return True
+            except Exception as exc:
+                self.log_debug(f"Vosk model load failed: {exc}")
+                self._vosk_model = None
+                return False
 
     def _voice_for_persona(self, persona):
         voices = {
@@ -182,6 +190,7 @@ class VoiceEngine:
     def set_persona(self, persona):
         # Map personas to specific OpenAI voices
         self.persona = persona.lower()
+        get_meter().set_persona(self.persona)
         self.voice = self._voice_for_persona(self.persona)
         self.voice_override = False
         self._system_voice_id = None
@@ -214,9 +223,47 @@ class VoiceEngine:
     def toggle_mute(self):
         return self.set_muted(not self.muted)
 
+    def _ensure_mixer(self):
+        if self._pygame is not None:
+            return self._pygame
+        with self._mixer_lock:
+            if self._pygame is not None:
+                return self._pygame
+            pygame = lazy_import("pygame")
+            # Initialize pygame mixer
+            try:
+                pygame.mixer.quit() # Reset if needed
+                pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
+            except Exception as e:
+                print(f"Mixer Init Error: {e}")
+                pygame.mixer.init()
+
+            # Load UI sounds
+            sound_files = ["wake", "think", "listen"]
+            for s in sound_files:
+                path = f"assets/{s}.wav"
+                if os.path.exists(path):
+                    self.ui_sounds[s] = pygame.mixer.Sound(path)
+            self._pygame = pygame
+        return pygame
+
+    def warm_up(self):
+        # Optional: lets boot prepare audio and the offline recognizer before they are first needed.
+        try:
+            self._ensure_mixer()
+        except Exception as e:
+            self.log_debug(f"Mixer warm-up failed: {e}")
+        if self.offline_stt:
+            self._ensure_vosk_model()
+
     def play_ui_sound(self, name):
         if self.muted:
             return
+        try:
+            self._ensure_mixer()
+        except Exception as e:
+            self.log_debug(f"Mixer unavailable: {e}")
+            return
         if name in self.ui_sounds:
             self.ui_sounds[name].play()
 
@@ -245,13 +292,78 @@ class VoiceEngine:
             self.log_debug(f"Offline TTS failed: {exc}")
             return False
 
-    def speak(self, text):
+    def _synthesize(self, text, deadline):
+        def _make_call(timeout):
+            options = {"timeout": timeout} if timeout is not None else {}
+            return self.client.audio.speech.create(
+                model="tts-1",
+                voice=self.voice,
+                input=text,
+                **options
+            )
+
+        started = time.monotonic()
+        response = call_with_retry(_make_call, deadline=deadline, attempts=2)
+        # Only the OpenAI path is billable; offline speech never reaches this point.
+        self.total_chars += len(text)
+        self.total_cost += get_meter().record_tts("tts-1", len(text), latency=time.monotonic() - started)
+        return response
+
+    def _tts_cache_path(self, text):
+        digest = hashlib.sha1(f"tts-1|{self.voice}|{text}".encode("utf-8")).hexdigest()[:16]
+        return os.path.join(_tts_cache_dir(), f"{digest}.mp3")
+
+    def _prune_tts_cache(self):
+        try:
+            paths = [os.path.join(_tts_cache_dir(), name) for name in os.listdir(_tts_cache_dir()) if name.endswith(".mp3")]
+        except OSError:
+            return
+        if len(paths) <= TTS_CACHE_MAX_FILES:
+            return
+        paths.sort(key=lambda path: os.path.getmtime(path))
+        for path in paths[:-TTS_CACHE_MAX_FILES]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def prerender(self, text, deadline=None):
+        """Render a fixed phrase to the on-disk TTS cache and return its path (None if it would be spoken offline)."""
+        if self.offline_tts or (self.persona in ("jarvis", "friday") and not self.voice_override):
+            return None
+        path = self._tts_cache_path(text)
+        if os.path.exists(path) and os.path.getsize(path) >= 100:
+            return path
+        response = self._synthesize(text, deadline or Deadline.after(self.tts_deadline))
+        os.makedirs(_tts_cache_dir(), exist_ok=True)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        response.write_to_file(temp_path)
+        file_size = os.path.getsize(temp_path)
+        if file_size < 100:
+            os.remove(temp_path)
+            raise Exception(f"Generated audio file is too small or empty ({file_size} bytes).")
+        os.replace(temp_path, path)
+        self._prune_tts_cache()
+        return path
+
+    def _play_file(self, path):
+        pygame = self._ensure_mixer()
+        pygame.mixer.music.load(path)
+        pygame.mixer.music.set_volume(1.0)
+        print("Playing audio...")
+        pygame.mixer.music.play()
+
+        # Wait for playback to finish
+        while pygame.mixer.music.get_busy():
+            pygame.time.Clock().tick(10)
+
+        pygame.mixer.music.unload()
+
+    def speak(self, text, deadline=None, cached=False):
+        # cached=True plays (or renders once) a clip from the TTS cache; use it for fixed phrases only.
         print(f"Mavrick: {text}")
         if self.muted:
             return
-        self.total_chars += len(text)
-        # OpenAI TTS costs $0.015 per 1,000 characters
-        self.total_cost += (len(text) / 1000) * 0.015
         system_voice_id = None
         if self.persona in ("jarvis", "friday"):
             system_voice_id = self._ensure_system_voice()
@@ -259,12 +371,14 @@ class VoiceEngine:
             if self._speak_offline(text, voice_id=system_voice_id):
                 return
         try:
-            # Generate speech using OpenAI TTS
-            response = self.client.audio.speech.create(
-                model="tts-1",
-                voice=self.voice,
-                input=text
-            )
+            if cached:
+                path = self.prerender(text, deadline)
+                if path:
+                    self._play_file(path)
+                    return
+
+            # Generate speech using OpenAI TTS (an expired deadline falls through to local TTS)
+            response = self._synthesize(text, deadline or Deadline.after(self.tts_deadline))
             
             # Save to temp file and play
             with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as f:
@@ -279,17 +393,9 @@ class VoiceEngine:
                 
             print(f"Audio file generated ({file_size} bytes): {temp_path}")
             
-            pygame.mixer.music.load(temp_path)
-            pygame.mixer.music.set_volume(1.0)
-            print("Playing audio...")
-            pygame.mixer.music.play()
-            
-            # Wait for playback to finish
-            while pygame.mixer.music.get_busy():
-                pygame.time.Clock().tick(10)
+            self._play_file(temp_path)
             
             # Cleanup
-            pygame.mixer.music.unload()
             os.remove(temp_path)
             
         except Exception as e:
@@ -1,5 +1,5 @@
-import requests
 from requests.exceptions import RequestException
+from engine import transport
 
 class WeatherEngine:
     BASE_URL = "https://wttr.in/?format=%C+%t"
@@ -12,7 +12,7 @@ class WeatherEngine:
         """
         try:
             # Setting a timeout to prevent hanging if the service is slow
-            response = requests.get(WeatherEngine.BASE_URL, timeout=5)
+            response = transport.get_session().get(WeatherEngine.BASE_URL, timeout=5)
             if response.status_code == 200:
                 print(f"Weather fetched: {response.text.strip()}")
                 return response.text.strip()
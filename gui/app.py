@@ -6,12 +6,12 @@ import threading
 import time
 import tkinter as tk
 from tkinter import messagebox
-import psutil
-import numpy as np
-import pyaudio
+from engine.startup import lazy_import, profiler
 from engine.actions import MavrickActions
 from engine import session_log
 from engine import command_history
+from engine import event_store
+from engine.command_completion import CommandCompleter
 from engine import notes
 from engine.weather import WeatherEngine
 from ctypes import windll, c_int, byref, sizeof
@@ -53,11 +53,14 @@ class MavrickUI(ctk.CTk):
         self._protocol_editor = None
         self._action_log_window = None
         self._action_log_text = None
+        self._action_log_status_var = None
+        self._action_log_period_var = None
         self._reminders_window = None
         self._reminders_text = None
         self._reminder_id_entry = None
         self._session_log_window = None
         self._session_log_text = None
+        self._event_queries = {}
         self._close_callback = self.destroy
         self._settings_window = None
         self._settings_name_entry = None
@@ -68,6 +71,7 @@ class MavrickUI(ctk.CTk):
         self._profile_loader = None
         self._profile_saver = None
         self._text_command_callback = None
+        self._cancel_callback = None
         self._command_entry = None
         self._command_send_btn = None
         self._command_history_window = None
@@ -75,6 +79,12 @@ class MavrickUI(ctk.CTk):
         self._command_history = []
         self._command_history_index = 0
         self._command_history_loaded = False
+        self._command_history_query = 0
+        self._command_history_loading = False
+        self._command_history_unsynced = []
+        self._completer = CommandCompleter()
+        self._completion_anchor = None
+        profiler.start("command completion", self._completer.load_history)
         self._notes_window = None
         self._notes_text = None
         self._note_input = None
@@ -84,6 +94,7 @@ class MavrickUI(ctk.CTk):
         self._help_shortcuts_frame = None
         self._shortcuts = []
         self._protocols_cache = {}
+        MavrickActions.add_protocols_listener(self._on_protocols_changed)
         self._protocol_var = None
         self._protocol_menu = None
         self._protocol_name_entry = None
@@ -146,27 +157,36 @@ class MavrickUI(ctk.CTk):
         self.disk_read_bps = 0.0
         self.disk_write_bps = 0.0
         
-        # Audio Stream for Visualizer
-        self.p = pyaudio.PyAudio()
+        # Audio Stream for Visualizer (opened off the UI thread; bars stay flat until it is ready)
+        self.p = None
         self.stream = None
         self.audio_running = False
-        try:
-            self.stream = self.p.open(format=pyaudio.paInt16,
-                                      channels=1,
-                                      rate=44100,
-                                      input=True,
-                                      frames_per_buffer=1024)
-            self.audio_running = True
-        except Exception as e:
-            print(f"Audio Input Error: {e}")
-            self.audio_running = False
+        self._np = None
 
         self.setup_ui()
         self._bind_shortcuts()
+        self.start_audio_thread()
         self.start_monitor_thread()
         self.start_weather_thread()
         self.animate_hud()
 
+    def start_audio_thread(self):
+        def open_stream():
+            try:
+                pyaudio = lazy_import("pyaudio")
+                self._np = lazy_import("numpy")
+                self.p = pyaudio.PyAudio()
+                self.stream = self.p.open(format=pyaudio.paInt16,
+                                          channels=1,
+                                          rate=44100,
+                                          input=True,
+                                          frames_per_buffer=1024)
+                self.audio_running = True
+            except Exception as e:
+                print(f"Audio Input Error: {e}")
+                self.audio_running = False
+        threading.Thread(target=open_stream, daemon=True).start()
+
     def setup_ui(self):
         # Header with futuristic font (Orbitron is common for sci-fi)
         title_font = ("Orbitron", 28, "bold")
@@ -259,6 +279,9 @@ class MavrickUI(ctk.CTk):
         self._command_entry.bind("<Return>", self._send_text_command)
         self._command_entry.bind("<Up>", self._history_prev)
         self._command_entry.bind("<Down>", self._history_next)
+        self._command_entry.bind("<KeyRelease>", self._autocomplete_command)
+        self._command_entry.bind("<Tab>", self._accept_completion)
+        self._refresh_command_history_cache()
 
         self._command_send_btn = ctk.CTkButton(self.command_frame, text="SEND", width=70, height=32, command=self._send_text_command)
         self._command_send_btn.pack(side="left", padx=(8, 0))
@@ -363,8 +386,19 @@ class MavrickUI(ctk.CTk):
         if selected_name and selected_name != "(none)":
             self._load_protocol_into_editor(selected_name)
 
+    def _on_protocols_changed(self, protocols):
+        self._protocols_cache = dict(protocols)
+        if threading.current_thread() is threading.main_thread():
+            # Saves from the editor refresh the menu themselves with the right selection.
+            return
+
+        def _refresh():
+            if self._protocol_editor and self._protocol_editor.winfo_exists():
+                self._refresh_protocol_menu(select_name=self._protocol_var.get() if self._protocol_var else None)
+
+        self.after(0, _refresh)
+
     def _refresh_protocol_menu(self, select_name=None):
-        self._protocols_cache = MavrickActions.get_protocols()
         protocol_names = sorted(self._protocols_cache.keys())
 
         if not protocol_names:
@@ -425,6 +459,7 @@ class MavrickUI(ctk.CTk):
         self._refresh_protocol_menu()
 
     def _reload_protocols(self):
+        self._protocols_cache = MavrickActions.reload_protocols()
         self._refresh_protocol_menu()
 
     def confirm_action(self, action_type, detail):
@@ -465,7 +500,7 @@ class MavrickUI(ctk.CTk):
 
         self._action_log_window = ctk.CTkToplevel(self)
         self._action_log_window.title("Action Log")
-        self._action_log_window.geometry("560x360")
+        self._action_log_window.geometry("560x400")
         self._action_log_window.resizable(False, False)
         try:
             self._action_log_window.iconbitmap(self._icon_path)
@@ -475,6 +510,15 @@ class MavrickUI(ctk.CTk):
         title = ctk.CTkLabel(self._action_log_window, text="ACTION LOG", font=("Orbitron", 16, "bold"), text_color=self.primary_cyan)
         title.pack(pady=(10, 6))
 
+        filter_frame = ctk.CTkFrame(self._action_log_window, fg_color="transparent")
+        filter_frame.pack(fill="x", padx=12, pady=(0, 6))
+        self._action_log_status_var = tk.StringVar(value="all")
+        status_menu = ctk.CTkOptionMenu(filter_frame, values=["all", "executed", "blocked", "failed", "missing"], variable=self._action_log_status_var, width=120, command=lambda _: self._load_action_log())
+        status_menu.pack(side="left")
+        self._action_log_period_var = tk.StringVar(value="all time")
+        period_menu = ctk.CTkOptionMenu(filter_frame, values=["all time", "today", "yesterday", "last 7 days", "last 30 days"], variable=self._action_log_period_var, width=140, command=lambda _: self._load_action_log())
+        period_menu.pack(side="left", padx=8)
+
         self._action_log_text = ctk.CTkTextbox(self._action_log_window, height=220)
         self._action_log_text.pack(fill="both", expand=True, padx=12, pady=(0, 8))
 
@@ -495,7 +539,21 @@ class MavrickUI(ctk.CTk):
     def _load_action_log(self):
         if not self._action_log_text:
             return
-        entries = MavrickActions.get_action_log(limit=200)
+        status = self._action_log_status_var.get() if self._action_log_status_var else "all"
+        period = self._action_log_period_var.get() if self._action_log_period_var else "all time"
+        since, until = {
+            "today": ("today", None),
+            "yesterday": ("yesterday", "yesterday"),
+            "last 7 days": ("7d", None),
+            "last 30 days": ("30d", None)
+        }.get(period, (None, None))
+        empty = "No actions logged yet." if status == "all" and period == "all time" else "No matching actions."
+        self._search_events("action", lambda events: self._show_action_log(events, empty), limit=200, sources=["action"], statuses=None if status == "all" else [status], since=since, until=until)
+
+    def _show_action_log(self, events, empty):
+        if not self._action_log_text or not self._action_log_text.winfo_exists():
+            return
+        entries = [event["entry"] for event in reversed(events)]
         lines = []
         for entry in entries:
             timestamp = entry.get("timestamp", "")
@@ -504,13 +562,37 @@ class MavrickUI(ctk.CTk):
             detail = entry.get("detail", "")
             lines.append(f"{timestamp} | {status} | {action} | {detail}")
         if not lines:
-            lines.append("No actions logged yet.")
+            lines.append(empty)
 
         self._action_log_text.configure(state="normal")
         self._action_log_text.delete("1.0", "end")
         self._action_log_text.insert("end", "\n".join(lines))
         self._action_log_text.configure(state="disabled")
 
+    def _search_events(self, view, render, **filters):
+        # The query flushes the log writer and may read archives, so it runs off the Tk thread;
+        # only the newest request per view gets rendered.
+        token = self._event_queries.get(view, 0) + 1
+        self._event_queries[view] = token
+
+        def worker():
+            try:
+                events = event_store.search(**filters)
+            except Exception as e:
+                print(f"Log query failed: {e}")
+                events = []
+
+            def deliver():
+                if self._event_queries.get(view) == token:
+                    render(events)
+
+            try:
+                self.after(0, deliver)
+            except Exception:
+                pass
+
+        threading.Thread(target=worker, daemon=True).start()
+
     def _clear_action_log(self):
         if not messagebox.askyesno("Clear Log", "Clear the action log?"):
             return
@@ -557,7 +639,12 @@ class MavrickUI(ctk.CTk):
     def _load_session_log(self):
         if not self._session_log_text:
             return
-        entries = session_log.read_entries(limit=250)
+        self._search_events("session", self._show_session_log, limit=250, sources=["session"])
+
+    def _show_session_log(self, events):
+        if not self._session_log_text or not self._session_log_text.winfo_exists():
+            return
+        entries = [event["entry"] for event in reversed(events)]
         lines = []
         for entry in entries:
             timestamp = entry.get("timestamp", "")
@@ -802,6 +889,12 @@ class MavrickUI(ctk.CTk):
             description="Engage voice listening",
             handler=self._trigger_listen
         )
+        self._register_shortcut(
+            patterns=["<Escape>"],
+            label="Esc",
+            description="Cancel the current request",
+            handler=self._trigger_cancel
+        )
         self._register_shortcut(
             patterns=["<Control-l>"],
             label="Ctrl+L",
@@ -882,6 +975,12 @@ class MavrickUI(ctk.CTk):
         except Exception:
             pass
 
+    def _trigger_cancel(self):
+        if not self._cancel_callback:
+            return
+        if self._cancel_callback():
+            self.log_message("> SYSTEM: Cancelling current request...")
+
     def _focus_command_entry(self):
         if self._command_entry:
             self._command_entry.focus_set()
@@ -1155,9 +1254,18 @@ class MavrickUI(ctk.CTk):
     def set_text_command_callback(self, callback):
         self._text_command_callback = callback
 
+    def set_cancel_callback(self, callback):
+        self._cancel_callback = callback
+
     def _send_text_command(self, event=None):
         if not self._text_command_callback or not self._command_entry:
             return
+        if self._completion_anchor is not None:
+            # A suggestion still shown selected was not accepted and is not part of the command;
+            # once accepted (Tab, Right, End, a click) the selection is gone and the text stays.
+            if self._command_entry.select_present():
+                self._command_entry.delete(self._completion_anchor, "end")
+            self._completion_anchor = None
         text = self._command_entry.get().strip()
         if not text:
             return
@@ -1165,23 +1273,90 @@ class MavrickUI(ctk.CTk):
         self._remember_command(text)
         self._text_command_callback(text)
 
-    def _remember_command(self, text):
-        if self._command_history and self._command_history[-1] == text:
-            self._command_history_index = len(self._command_history)
+    def _autocomplete_command(self, event=None):
+        if not self._command_entry or event is None:
+            return
+        if not event.char or not event.char.isprintable():
+            if event.keysym in ("BackSpace", "Delete", "Left", "Up", "Down", "Escape"):
+                self._completion_anchor = None
+            return
+        text = self._command_entry.get()
+        position = self._command_entry.index("insert")
+        if position != len(text):
             return
-        self._command_history.append(text)
+        for suggestion in self._completer.suggest(text, limit=5):
+            if len(suggestion) > len(text) and suggestion.lower().startswith(text.lower()):
+                # Inline completion: the rest of the suggestion is selected, so typing replaces it.
+                self._command_entry.insert("end", suggestion[len(text):])
+                self._command_entry.select_range(position, "end")
+                self._command_entry.icursor(position)
+                self._completion_anchor = position
+                return
+        self._completion_anchor = None
+
+    def _accept_completion(self, event=None):
+        if not self._command_entry or self._completion_anchor is None:
+            return None
+        self._command_entry.select_clear()
+        self._command_entry.icursor("end")
+        self._completion_anchor = None
+        return "break"
+
+    def learn_command(self, text):
+        # Safe from any thread; the completer has its own lock.
+        self._completer.add(text)
+
+    def _remember_command(self, text):
+        self._completer.add(text)
+        self._append_history(text)
+        if self._command_history_loading:
+            # A background load may have read the file before this command reached it.
+            self._command_history_unsynced.append(text)
+        self._command_history_loaded = True
+
+    def _append_history(self, text):
+        if not self._command_history or self._command_history[-1] != text:
+            self._command_history.append(text)
         if len(self._command_history) > 200:
             self._command_history = self._command_history[-200:]
         self._command_history_index = len(self._command_history)
-        self._command_history_loaded = True
 
     def _refresh_command_history_cache(self, force=False):
-        if self._command_history_loaded and not force:
+        # Reading the history flushes the log writer and may scan archives, so it runs off the
+        # Tk thread; Up/Down work on whatever is loaded until the result arrives.
+        if not force and (self._command_history_loaded or self._command_history_loading):
             return
-        entries = command_history.read_entries(limit=200, source="text")
-        self._command_history = [entry.get("text", "") for entry in entries if entry.get("text")]
-        self._command_history_index = len(self._command_history)
-        self._command_history_loaded = True
+        self._command_history_query += 1
+        token = self._command_history_query
+        self._command_history_loading = True
+        self._command_history_unsynced = []
+
+        def worker():
+            try:
+                entries = command_history.read_entries(limit=200, source="text")
+            except Exception as e:
+                print(f"Command history load failed: {e}")
+                entries = []
+            texts = [entry.get("text", "") for entry in entries if entry.get("text")]
+
+            def apply():
+                if self._command_history_query != token:
+                    return
+                self._command_history = texts
+                for text in self._command_history_unsynced:
+                    self._append_history(text)
+                self._command_history_index = len(self._command_history)
+                self._command_history_unsynced = []
+                self._command_history_loading = False
+                self._command_history_loaded = True
+
+            try:
+                self.after(0, apply)
+            except Exception:
+                # The Tk loop is not running (yet, or any more); let the next Up/Down retry.
+                self._command_history_loading = False
+
+        threading.Thread(target=worker, daemon=True).start()
 
     def _history_prev(self, event=None):
         if not self._command_entry:
@@ -1258,7 +1433,12 @@ class MavrickUI(ctk.CTk):
     def _load_command_history(self):
         if not self._command_history_text:
             return
-        entries = command_history.read_entries(limit=250)
+        self._search_events("command", self._show_command_history, limit=250, sources=["command"])
+
+    def _show_command_history(self, events):
+        if not self._command_history_text or not self._command_history_text.winfo_exists():
+            return
+        entries = [event["entry"] for event in reversed(events)]
         lines = []
         for entry in entries:
             timestamp = entry.get("timestamp", "")
@@ -1292,9 +1472,13 @@ class MavrickUI(ctk.CTk):
         if not messagebox.askyesno("Clear History", "Clear command history?"):
             return
         command_history.clear_entries()
+        self._completer.clear()
         self._command_history = []
         self._command_history_index = 0
         self._command_history_loaded = False
+        # Drop any load that started before the clear.
+        self._command_history_query += 1
+        self._command_history_loading = False
         self._load_command_history()
 
     def _open_command_history_file(self):
@@ -1416,6 +1600,9 @@ class MavrickUI(ctk.CTk):
         if not os.path.exists(path):
             messagebox.showinfo("Notes", "No notes file yet.")
             return
+        if not path.endswith(".json"):
+            # The database is not human-readable; show its folder instead.
+            path = os.path.dirname(path)
         try:
             os.startfile(path)
         except Exception:
@@ -1459,8 +1646,17 @@ class MavrickUI(ctk.CTk):
     def clear_log(self):
         self.log_box.delete("0.0", "end")
 
-    def update_stats(self, cost, tokens, balance):
-        self.stats_label.configure(text=f"COST: ${cost:.4f} | TOKENS: {tokens}")
+    def update_stats(self, cost, tokens, balance, cache_rate=None, response_hits=None, tool_stats=None):
+        stats_text = f"COST: ${cost:.4f} | TOKENS: {tokens}"
+        if cache_rate is not None:
+            stats_text += f" | CACHED: {cache_rate * 100:.0f}%"
+        if response_hits:
+            stats_text += f" | HITS: {response_hits}"
+        if tool_stats and tool_stats.get("memo_lookups"):
+            stats_text += f" | MEMO: {tool_stats['memo_hits']}/{tool_stats['memo_lookups']}"
+        if tool_stats and tool_stats.get("prefetch_hits"):
+            stats_text += f" | PREFETCH: {tool_stats['prefetch_hits']}"
+        self.stats_label.configure(text=stats_text)
         self.balance_label.configure(text=f"BALANCE: ${balance:.2f}")
         if balance <= 0:
             self.balance_label.configure(text_color="#ff4b2b") # Red for alert
@@ -1469,6 +1665,7 @@ class MavrickUI(ctk.CTk):
         
     def start_monitor_thread(self):
         def monitor():
+            psutil = lazy_import("psutil")
             last_net = psutil.net_io_counters()
             last_disk = psutil.disk_io_counters()
             last_time = time.time()
@@ -1657,6 +1854,7 @@ class MavrickUI(ctk.CTk):
 
     def update_visualizer(self):
         if self.audio_running and self.stream:
+            np = self._np
             try:
                 data = np.frombuffer(self.stream.read(1024, exception_on_overflow=False), dtype=np.int16)
                 # Compute FFT
@@ -3,21 +3,41 @@ import sys
 import os
 import time
 import socket
+from concurrent.futures import CancelledError
 from tkinter import messagebox
 from dotenv import load_dotenv
 
 # Add current directory to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from engine.brain import MavrickBrain
+from engine import startup
+startup.profiler.install_import_hook()
+
 from engine.actions import MavrickActions
 from engine import command_history
 from engine.scheduler import ReminderScheduler
-from engine.voice import VoiceEngine
-from engine.profile import load_profile, save_profile
+from engine.weather import WeatherEngine
+from engine.profile import get_profile_store
+from engine import transport
+from engine import log_writer
+from engine.resilience import Deadline
 from gui.app import MavrickUI
 from gui.tray import TrayController
 
+TERMINATION_PHRASES = ["stop listening", "go to sleep", "terminate session", "thank you mavrick", "that's all"]
+CRASH_LOG = "mavrick_crash_log.txt"
+
+
+def write_crash_log(error_log=CRASH_LOG):
+    # Call from inside an except block: records the exception being handled.
+    import traceback
+    with open(error_log, "w") as f:
+        f.write("CRITICAL SYSTEM FAILURE\n")
+        f.write("="*60 + "\n")
+        traceback.print_exc(file=f)
+        f.write("="*60 + "\n")
+    return error_log
+
 class MavrickAssistant:
     def __init__(self):
         # Single Instance Lock
@@ -32,23 +52,30 @@ class MavrickAssistant:
             sys.exit(0)
 
         load_dotenv(override=True)
-        self.profile = load_profile()
+        self.profile_store = get_profile_store()
+        self.profile = self.profile_store.load()
         profile_user_name = self.profile.get("user_name", os.getenv("USER_NAME", "Sir"))
         profile_persona = self.profile.get("persona", "mavrick")
         profile_voice = self.profile.get("voice")
         profile_wake_words = self.profile.get("wake_words")
         profile_summary = self.profile.get("summary", "")
 
-        self.brain = MavrickBrain(user_name=profile_user_name, summary=profile_summary)
-        self.voice = VoiceEngine(
-            user_name=profile_user_name,
-            voice=profile_voice,
-            persona=profile_persona,
-            wake_words=profile_wake_words
+        # Brain, voice and the weather connection come up in parallel while the HUD is built.
+        self._brain_ready = startup.profiler.start("brain", self._create_brain, profile_user_name, profile_summary)
+        self._voice_ready = startup.profiler.start(
+            "voice",
+            self._create_voice,
+            profile_user_name,
+            profile_voice,
+            profile_persona,
+            profile_wake_words
         )
-        self.ui = MavrickUI()
+        self._weather_ready = startup.profiler.start("weather", transport.warm_up, [WeatherEngine.BASE_URL])
+        with startup.profiler.measure("hud"):
+            self.ui = MavrickUI()
         self.ui.set_profile_callbacks(self.get_profile_snapshot, self.apply_profile_update)
         self.ui.set_text_command_callback(self.start_text_command)
+        self.ui.set_cancel_callback(self.cancel_current_request)
         self.ui.set_close_action(self.minimize_to_tray)
         self.ui.btn_exit.configure(command=self.shutdown)
         self.scheduler = ReminderScheduler(on_trigger=self._handle_reminder)
@@ -72,11 +99,34 @@ class MavrickAssistant:
         self.continuous_mode = False
         self.should_stop_listening = False
         self.debug_mode = os.getenv("DEBUG_MODE", "False") == "True"
-        
-        # Start background listener
-        self.voice.start_background_listening(self.on_wake_word, lambda: self.is_running)
-        self.log_debug("Background awareness activated.")
-        self.ui.status_label.configure(text="NETWORK STATUS: STANDBY (AWARE)", text_color=self.ui.secondary_teal)
+        try:
+            self.turn_budget = float(os.getenv("TURN_DEADLINE_SECONDS", "45"))
+        except (ValueError, TypeError):
+            self.turn_budget = 45.0
+
+    @staticmethod
+    def _create_brain(user_name, summary):
+        from engine.brain import MavrickBrain
+        return MavrickBrain(user_name=user_name, summary=summary)
+
+    @staticmethod
+    def _create_voice(user_name, voice, persona, wake_words):
+        from engine.voice import VoiceEngine
+        return VoiceEngine(
+            user_name=user_name,
+            voice=voice,
+            persona=persona,
+            wake_words=wake_words
+        )
+
+    @property
+    def brain(self):
+        # Blocks only if something needs the brain before its background init has finished.
+        return self._brain_ready.result()
+
+    @property
+    def voice(self):
+        return self._voice_ready.result()
 
     def log_debug(self, msg):
         if self.debug_mode:
@@ -122,7 +172,7 @@ class MavrickAssistant:
         return "Profile updated."
 
     def _persist_profile(self):
-        self.profile = save_profile(self.profile)
+        self.profile = self.profile_store.update(self.profile)
 
     def _update_profile_summary(self):
         summary = self.brain.get_summary()
@@ -193,7 +243,21 @@ class MavrickAssistant:
             self.tray.set_muted(self.is_muted)
         return self.is_muted
 
+    def cancel_current_request(self):
+        # Barge-in: drop the in-flight brain request and leave continuous mode.
+        self.continuous_mode = False
+        self.should_stop_listening = True
+        # Runs on the Tk thread: never wait for a brain that is still starting (or failed to).
+        if not self._brain_ready.done() or self._brain_ready.exception() is not None:
+            return False
+        return self.brain.cancel_pending()
+
     def shutdown(self):
+        try:
+            if self.brain:
+                self.brain.close()
+        except Exception:
+            pass
         try:
             if self.scheduler:
                 self.scheduler.stop()
@@ -209,6 +273,18 @@ class MavrickAssistant:
                 self.tray.stop()
         except Exception:
             pass
+        try:
+            transport.close()
+        except Exception:
+            pass
+        try:
+            self.profile_store.flush()
+        except Exception:
+            pass
+        try:
+            log_writer.close()
+        except Exception:
+            pass
         try:
             self.ui.after(0, self.ui.destroy)
         except Exception:
@@ -217,8 +293,18 @@ class MavrickAssistant:
             except Exception:
                 pass
 
+    def _listener_paused(self):
+        # The background listener stays deaf while a command runs, except while the brain is
+        # thinking: the microphone is free then, and a wake word means barge-in.
+        return self.is_running and not self.brain.is_busy()
+
     def on_wake_word(self):
         self.log_debug(f"on_wake_word triggered. Current State - is_running: {self.is_running}")
+        if self.is_running:
+            if self.brain.is_busy() and self.cancel_current_request():
+                self.log_debug("Wake word during a pending request. Cancelling it.")
+                self.ui.log_message("> SYSTEM: Cancelling current request...")
+            return
         if not self.is_running:
             self.continuous_mode = True
             self.should_stop_listening = False
@@ -246,10 +332,12 @@ class MavrickAssistant:
             thread.start()
 
     def start_text_command(self, text):
+        query = str(text).strip()
         if self.is_running:
+            if any(phrase in query.lower() for phrase in TERMINATION_PHRASES) and self.cancel_current_request():
+                return
             self.ui.log_message("> SYSTEM: Busy. Try again.")
             return
-        query = str(text).strip()
         if not query:
             return
         thread = threading.Thread(target=self._process_text_command, daemon=True, args=(query,))
@@ -271,9 +359,10 @@ class MavrickAssistant:
     def _handle_query(self, query, source="voice"):
         if query != "None" and query != "":
             command_history.append_entry(query, source=source)
+            if source == "voice":
+                self.ui.learn_command(query)
             # Check for termination phrases
-            termination_phrases = ["stop listening", "go to sleep", "terminate session", "thank you mavrick", "that's all"]
-            if any(phrase in query.lower() for phrase in termination_phrases):
+            if any(phrase in query.lower() for phrase in TERMINATION_PHRASES):
                 self.log_debug(f"Termination phrase detected in: '{query}'")
                 self.ui.log_message(f"> User: {query}")
                 self.voice.speak("Understood. Returning to standby.")
@@ -288,8 +377,17 @@ class MavrickAssistant:
             # UI Sound
             self.voice.play_ui_sound("think")
 
+            # One budget for the whole turn: the brain spends what it needs, TTS gets the rest.
+            deadline = Deadline.after(self.turn_budget)
+
             # Brain response
-            response = self.brain.get_response(query)
+            try:
+                response = self.brain.submit_query(query, deadline=deadline).result()
+            except CancelledError:
+                self.log_debug("Brain request cancelled by user.")
+                self.ui.log_message("> SYSTEM: Request canceled.")
+                self.ui.status_label.configure(text="NETWORK STATUS: STANDBY", text_color=self.ui.primary_cyan)
+                return
             self.log_debug(f"Brain reasoning complete. Response length: {len(response)}")
 
             # Intercept Special Markers
@@ -309,10 +407,21 @@ class MavrickAssistant:
             self.ui.status_label.configure(text="NETWORK STATUS: SPEAKING", text_color="#00ff00")
 
             # Speak
-            self.voice.speak(response)
+            self.voice.speak(response, deadline=deadline)
 
             # Update HUD Stats
-            self.ui.update_stats(self.brain.session_cost, self.brain.total_tokens, self.brain.current_balance)
+            self.ui.update_stats(
+                self.brain.meter.session_cost,
+                self.brain.total_tokens,
+                self.brain.meter.balance,
+                cache_rate=self.brain.get_cache_hit_rate(),
+                response_hits=self.brain.response_cache.hits,
+                tool_stats=self.brain.get_tool_stats()
+            )
+            if self.debug_mode:
+                self.log_debug(f"Tool cache: {self.brain.tool_cache.stats()}")
+                self.log_debug(f"Tool output: {self.brain.output_governor.stats()}")
+                self.log_debug(f"Tool totals: {self.brain.get_tool_stats()}")
             self._update_profile_summary()
         else:
             self.log_debug("No audible input or confidence too low.")
@@ -359,27 +468,66 @@ class MavrickAssistant:
         finally:
             self._finalize_command()
 
+    def _prerender_boot_line(self, text):
+        try:
+            return self.voice.prerender(text)
+        except Exception as e:
+            self.log_debug(f"Boot line pre-render failed: {e}")
+            return None
+
+    def _startup_failed(self, error_log):
+        messagebox.showerror("Critical Error", f"Mavrick crashed.\nError details written to:\n{error_log}")
+        self.shutdown()
+
     def boot_sequence(self):
-        # Thematic startup logs and voice
-        time.sleep(1.0)
-        
+        # Brain and voice start in the background; their init errors would otherwise only
+        # surface later, on whichever thread first touched them.
+        try:
+            self._brain_ready.result()
+            self._voice_ready.result()
+        except Exception:
+            error_log = write_crash_log()
+            self.ui.after(0, self._startup_failed, error_log)
+            return
+
         msg1 = "INITIALIZING NEURAL INTERFACE..."
-        self.ui.log_message(msg1)
-        self.voice.speak(msg1)
-        
         msg2 = "LINK ESTABLISHED."
+        greeting = f"Systems initialization complete... Welcome back, {self.brain.user_name}."
+
+        # Warm the API connection, audio/Vosk and the boot clips together. Clips are cached on
+        # disk, so after the first launch the intro plays without any TTS round trip.
+        self.brain.warm_up()
+        startup.profiler.start("audio", self.voice.warm_up)
+        clips = [startup.profiler.start(f"boot clip {index}", self._prerender_boot_line, line)
+                 for index, line in enumerate((msg1, msg2, greeting), start=1)]
+
+        # Start background listener now so its noise calibration overlaps the intro.
+        self.voice.start_background_listening(self.on_wake_word, self._listener_paused)
+        self.log_debug("Background awareness activated.")
+        self.ui.status_label.configure(text="NETWORK STATUS: STANDBY (AWARE)", text_color=self.ui.secondary_teal)
+        startup.profiler.mark("assistant ready")
+        startup.profiler.finish()
+
+        # Thematic startup logs and voice; each line plays as soon as its own clip is ready.
+        self.ui.log_message(msg1)
+        clips[0].result()
+        self.voice.speak(msg1, cached=True)
+
         self.ui.log_message(msg2)
-        self.voice.speak(msg2)
-        
+        clips[1].result()
+        self.voice.speak(msg2, cached=True)
+
         # Initial status update
         self.ui.update_stats(0, 0, self.brain.current_balance)
-        self.voice.speak(f"Systems initialization complete... Welcome back, {self.brain.user_name}.")
-        
+        clips[2].result()
+        self.voice.speak(greeting, cached=True)
+
         # Auto-engage continuous listening on boot
         print("Auto-engaging continuous listening mode...")
         self.start_voice_thread()
 
     def run(self):
+        self.ui.after(0, lambda: startup.profiler.mark("hud visible"))
         # Start boot sequence in a thread so it doesn't block UI start
         threading.Thread(target=self.boot_sequence, daemon=True).start()
         self.ui.mainloop()
@@ -389,14 +537,8 @@ if __name__ == "__main__":
         assistant = MavrickAssistant()
         assistant.run()
     except Exception as e:
-        import traceback
-        error_log = "mavrick_crash_log.txt"
-        with open(error_log, "w") as f:
-            f.write("CRITICAL SYSTEM FAILURE\n")
-            f.write("="*60 + "\n")
-            traceback.print_exc(file=f)
-            f.write("="*60 + "\n")
-        
+        error_log = write_crash_log()
+
         try:
             from tkinter import messagebox
             import tkinter as tk
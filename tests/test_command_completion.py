@@ -0,0 +1,93 @@
+from engine.command_completion import CommandCompleter
+
+DAY = 86400
+
+
+def _edges(node):
+    return {label: child for label, child in node.children.values()}
+
+
+def test_more_frequent_commands_rank_first():
+    completer = CommandCompleter()
+    completer.add("open notepad", when=1000)
+    for _ in range(3):
+        completer.add("open spotify", when=1000)
+    assert completer.suggest("open") == ["open spotify", "open notepad"]
+
+
+def test_recent_use_outweighs_old_frequency():
+    completer = CommandCompleter(half_life_days=1)
+    for _ in range(3):
+        completer.add("open notepad", when=0)
+    completer.add("open spotify", when=3 * DAY)
+    assert completer.suggest("op") == ["open spotify", "open notepad"]
+
+
+def test_matching_ignores_case_and_spacing_and_keeps_latest_spelling():
+    completer = CommandCompleter()
+    completer.add("open   notepad", when=1)
+    completer.add("Open Notepad", when=3)
+    completer.add("OPEN NOTEPAD", when=2)
+    assert len(completer) == 1
+    assert completer.suggest("  OPEN  no") == ["Open Notepad"]
+
+
+def test_exact_match_and_unknown_prefix_are_not_suggested():
+    completer = CommandCompleter()
+    completer.add("open notepad", when=1)
+    assert completer.suggest("open notepad") == []
+    assert completer.suggest("close") == []
+    assert completer.suggest("   ") == []
+
+
+def test_trailing_space_matches_whole_words_only():
+    completer = CommandCompleter()
+    completer.add("open notepad", when=1)
+    completer.add("opener test", when=1)
+    assert completer.suggest("open ") == ["open notepad"]
+    assert sorted(completer.suggest("open")) == ["open notepad", "opener test"]
+
+
+def test_edge_split_keeps_both_branches_reachable():
+    completer = CommandCompleter()
+    completer.add("open notepad", when=1)
+    assert list(_edges(completer._root)) == ["open notepad"]
+    completer.add("open spotify", when=2)
+    edges = _edges(completer._root)
+    assert list(edges) == ["open "]
+    assert sorted(_edges(edges["open "])) == ["notepad", "spotify"]
+    assert edges["open "].top == ["open spotify", "open notepad"]
+    assert completer.suggest("open n") == ["open notepad"]
+    assert completer.suggest("open s") == ["open spotify"]
+    assert completer.suggest("ope") == ["open spotify", "open notepad"]
+
+
+def test_key_that_ends_inside_an_edge_splits_it():
+    completer = CommandCompleter()
+    completer.add("open notepad", when=1)
+    completer.add("open", when=1)
+    edges = _edges(completer._root)
+    assert list(edges) == ["open"]
+    assert completer.suggest("op") == ["open notepad", "open"]
+    assert completer.suggest("open") == ["open notepad"]
+
+
+def test_each_node_keeps_only_top_k():
+    completer = CommandCompleter(top_k=2)
+    for count, name in enumerate(["alpha", "beta", "gamma"], start=1):
+        for _ in range(count):
+            completer.add(f"play {name}", when=1)
+    assert completer.suggest("play", limit=5) == ["play gamma", "play beta"]
+    completer.add("play alpha", when=1)
+    completer.add("play alpha", when=1)
+    completer.add("play alpha", when=1)
+    assert completer.suggest("play", limit=5) == ["play alpha", "play gamma"]
+    assert completer.suggest("play a") == ["play alpha"]
+
+
+def test_clear_forgets_everything():
+    completer = CommandCompleter()
+    completer.add("open notepad", when=1)
+    completer.clear()
+    assert len(completer) == 0
+    assert completer.suggest("open") == []
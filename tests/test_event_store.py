@@ -0,0 +1,94 @@
+import gzip
+import json
+import os
+
+import pytest
+
+from engine.event_store import EventStore, _rotation_bound, _SegmentIndex
+
+
+def _index(points, size):
+    index = _SegmentIndex(b"")
+    index.points = list(points)
+    index.size = size
+    index.first = points[0][0]
+    index.last = points[-1][0]
+    return index
+
+
+POINTS = [("2026-01-01T10:00:00", 0), ("2026-01-01T11:00:00", 100), ("2026-01-01T12:00:00", 200)]
+
+
+def test_byte_range_without_bounds_is_the_whole_segment():
+    assert _index(POINTS, 300).byte_range(None, None) == (0, 300)
+
+
+def test_byte_range_starts_at_the_point_before_since():
+    index = _index(POINTS, 300)
+    assert index.byte_range("2026-01-01T10:30:00", None) == (0, 300)
+    assert index.byte_range("2026-01-01T11:30:00", None) == (100, 300)
+    # An exact match still starts one point earlier: lines before it may share the stamp.
+    assert index.byte_range("2026-01-01T11:00:00", None) == (0, 300)
+
+
+def test_byte_range_ends_at_the_first_point_after_until():
+    index = _index(POINTS, 300)
+    assert index.byte_range(None, "2026-01-01T10:30:00") == (0, 100)
+    assert index.byte_range(None, "2026-01-01T11:00:00") == (0, 200)
+    assert index.byte_range(None, "2026-01-01T12:30:00") == (0, 300)
+
+
+def test_covers_checks_overlap_with_the_segment_span():
+    index = _index(POINTS, 300)
+    assert index.covers("2026-01-01T11:30:00", None)
+    assert not index.covers("2026-01-01T12:00:01", None)
+    assert not index.covers(None, "2026-01-01T09:59:59")
+    assert not _SegmentIndex(b"").covers(None, None)
+
+
+def test_rotation_bound_comes_from_the_archive_name():
+    path = os.path.join("logs", "actions.log")
+    assert _rotation_bound(path, path) is None
+    assert _rotation_bound(path, path + ".20260102-030405.gz") == "2026-01-02T03:04:06"
+    assert _rotation_bound(path, path + ".20260102-030405-2") == "2026-01-02T03:04:06"
+
+
+def _write(path, day, count, compress=False):
+    opener = gzip.open if compress else open
+    with opener(path, "wt", encoding="utf-8") as file:
+        for minute in range(count):
+            file.write(json.dumps({"timestamp": f"2026-01-{day:02d}T10:{minute:02d}:00", "action": "open", "status": "executed", "detail": str(minute)}) + "\n")
+
+
+@pytest.fixture
+def store(tmp_path):
+    live = str(tmp_path / "actions.log")
+    for day in (1, 2, 3):
+        _write(f"{live}.202601{day:02d}-235959.gz", day, 30, compress=True)
+    _write(live, 4, 30)
+    return EventStore(root=str(tmp_path), stride=4)
+
+
+def _indexed(store):
+    return sorted(os.path.basename(segment) for segment in store._indexes)
+
+
+def test_short_newest_first_read_leaves_old_archives_unopened(store):
+    events = store.query(limit=10, sources=["action"])
+    assert [event["timestamp"] for event in events][:2] == ["2026-01-04T10:29:00", "2026-01-04T10:28:00"]
+    assert _indexed(store) == ["actions.log"]
+
+
+def test_bounded_query_reads_only_overlapping_segments(store):
+    events = store.query(limit=100, sources=["action"], since="2026-01-02T10:20:00", until="2026-01-03T10:05:00")
+    assert len(events) == 16
+    assert events[0]["timestamp"] == "2026-01-03T10:05:00"
+    assert events[-1]["timestamp"] == "2026-01-02T10:20:00"
+    assert "actions.log.20260101-235959.gz" not in _indexed(store)
+
+
+def test_oldest_first_query_stops_after_until(store):
+    events = store.query(limit=100, sources=["action"], since="2026-01-02T10:10:00", until="2026-01-02", newest_first=False)
+    assert [event["timestamp"] for event in events] == [f"2026-01-02T10:{minute:02d}:00" for minute in range(10, 30)]
+    # Day 1 is skipped by its rotation stamp; day 3 is opened only to find it starts past the range.
+    assert _indexed(store) == ["actions.log.20260102-235959.gz", "actions.log.20260103-235959.gz"]
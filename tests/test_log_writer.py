@@ -0,0 +1,130 @@
+import datetime
+import gzip
+import json
+import os
+import time
+
+import pytest
+
+from engine import log_writer
+from engine.log_writer import JsonlWriter
+from engine.tail import log_segments
+
+
+@pytest.fixture
+def writer():
+    writer = JsonlWriter(flush_interval=0.05, max_bytes=200, rotate_daily=False, keep_archives=0, retention_days=0)
+    yield writer
+    writer.close()
+
+
+def _fill(writer, path, count):
+    for index in range(count):
+        assert writer.write(path, {"index": index, "pad": "x" * 40})
+    assert writer.flush()
+
+
+def _archives(path):
+    return [segment for segment in log_segments(path) if segment != path]
+
+
+def _lines(segment):
+    opener = gzip.open if segment.endswith(".gz") else open
+    with opener(segment, "rt", encoding="utf-8") as file:
+        return file.read().splitlines()
+
+
+def test_size_rotation_gzips_segments_and_keeps_every_record(writer, tmp_path):
+    path = str(tmp_path / "actions.log")
+    _fill(writer, path, 12)
+    archives = _archives(path)
+    assert archives and all(segment.endswith(".gz") for segment in archives)
+    # Rotation is checked before each write, so the live file holds at most one record past the limit.
+    assert len(_lines(path)) <= 200 // 60 + 1
+    total = sum(len(_lines(segment)) for segment in log_segments(path))
+    assert total == 12
+
+
+def test_segments_list_in_write_order(writer, tmp_path):
+    # Several rotations land in the same second; their counters must keep them in order.
+    path = str(tmp_path / "actions.log")
+    _fill(writer, path, 12)
+    assert len(_archives(path)) >= 2
+    indexes = [json.loads(line)["index"] for segment in log_segments(path) for line in _lines(segment)]
+    assert indexes == list(range(12))
+
+
+def test_daily_rotation_on_first_write_of_a_new_day(tmp_path):
+    path = str(tmp_path / "session.log")
+    with open(path, "w", encoding="utf-8") as file:
+        file.write('{"old": true}\n')
+    yesterday = time.time() - 86400
+    os.utime(path, (yesterday, yesterday))
+    writer = JsonlWriter(flush_interval=0.05, max_bytes=0, rotate_daily=True, keep_archives=0, retention_days=0)
+    try:
+        _fill(writer, path, 1)
+    finally:
+        writer.close()
+    archives = _archives(path)
+    assert len(archives) == 1 and _lines(archives[0]) == ['{"old": true}']
+    assert len(_lines(path)) == 1
+
+
+def test_prune_keeps_newest_archives(tmp_path):
+    path = str(tmp_path / "actions.log")
+    writer = JsonlWriter(flush_interval=0.05, max_bytes=200, rotate_daily=False, keep_archives=2, retention_days=0)
+    try:
+        _fill(writer, path, 30)
+    finally:
+        writer.close()
+    archives = _archives(path)
+    assert len(archives) == 2
+    # The newest records survive: the live file ends with the last one written.
+    assert '"index": 29' in _lines(path)[-1]
+
+
+def test_prune_drops_archives_past_retention(tmp_path):
+    path = str(tmp_path / "actions.log")
+    old = tmp_path / "actions.log.20200101-000000.gz"
+    with gzip.open(old, "wt", encoding="utf-8") as file:
+        file.write('{"index": -1}\n')
+    stale = time.time() - 10 * 86400
+    os.utime(old, (stale, stale))
+    writer = JsonlWriter(flush_interval=0.05, max_bytes=200, rotate_daily=False, keep_archives=0, retention_days=5)
+    try:
+        _fill(writer, path, 12)
+    finally:
+        writer.close()
+    assert str(old) not in _archives(path)
+    assert _archives(path)
+
+
+def test_failed_rename_keeps_counters_and_retries_later(writer, tmp_path, monkeypatch):
+    path = str(tmp_path / "actions.log")
+    real_replace = os.replace
+
+    def locked(source, target):
+        if source == path:
+            raise PermissionError("file in use")
+        return real_replace(source, target)
+
+    monkeypatch.setattr(log_writer.os, "replace", locked)
+    _fill(writer, path, 8)
+    assert writer.rotation_failures == 1
+    assert not _archives(path)
+
+    monkeypatch.setattr(log_writer.os, "replace", real_replace)
+    writer._retry_at.clear()
+    _fill(writer, path, 1)
+    archives = _archives(path)
+    assert len(archives) == 1 and len(_lines(archives[0])) == 8
+    assert len(_lines(path)) == 1
+
+
+def test_pending_plain_segment_is_compressed_on_open(writer, tmp_path):
+    path = str(tmp_path / "actions.log")
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    pending = tmp_path / f"actions.log.{stamp}"
+    pending.write_text('{"index": 0}\n', encoding="utf-8")
+    _fill(writer, path, 1)
+    assert _archives(path) == [str(pending) + ".gz"]
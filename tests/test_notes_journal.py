@@ -0,0 +1,84 @@
+import json
+import time
+
+import pytest
+
+from engine.notes import _JournalNotes
+
+
+@pytest.fixture
+def journal_path(tmp_path, monkeypatch):
+    # Keep the one-time notes.json import pointed at an empty folder.
+    monkeypatch.setenv("APPDATA", str(tmp_path))
+    return str(tmp_path / "notes.journal")
+
+
+def _note(note_id, text, created_at="2026-01-01T09:00:00"):
+    return {"id": note_id, "text": text, "created_at": created_at}
+
+
+def _records(path):
+    with open(path, "r", encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+
+def _wait_for_compaction(journal, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while journal._compacting and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not journal._compacting
+
+
+def test_replay_restores_adds_deletes_and_clears(journal_path):
+    journal = _JournalNotes(journal_path)
+    journal.add(_note("a", "first", "2026-01-01T09:00:00"))
+    journal.add(_note("b", "second", "2026-01-01T10:00:00"))
+    journal.delete("a")
+    journal._file.close()
+
+    reopened = _JournalNotes(journal_path)
+    assert [note["id"] for note in reopened.list(10)] == ["b"]
+    reopened.clear()
+    reopened.add(_note("c", "third"))
+    reopened._file.close()
+
+    assert [note["id"] for note in _JournalNotes(journal_path).list(10)] == ["c"]
+
+
+def test_delete_of_unknown_note_appends_nothing(journal_path):
+    journal = _JournalNotes(journal_path)
+    journal.add(_note("a", "first"))
+    assert not journal.delete("missing")
+    journal._file.close()
+    assert len(_records(journal_path)) == 1
+
+
+def test_partial_trailing_record_is_truncated(journal_path):
+    journal = _JournalNotes(journal_path)
+    journal.add(_note("a", "kept"))
+    journal._file.close()
+    with open(journal_path, "a", encoding="utf-8") as file:
+        file.write('{"op": "add", "id": "b", "te')
+
+    reopened = _JournalNotes(journal_path)
+    assert [note["id"] for note in reopened.list(10)] == ["a"]
+    reopened.add(_note("c", "after crash", "2026-01-02T09:00:00"))
+    reopened._file.close()
+    assert [record["id"] for record in _records(journal_path)] == ["a", "c"]
+
+
+def test_compaction_keeps_only_live_notes(journal_path):
+    journal = _JournalNotes(journal_path)
+    journal.COMPACT_MIN_RECORDS = 4
+    for index in range(3):
+        journal.add(_note(f"n{index}", f"note {index}", f"2026-01-01T09:00:0{index}"))
+    journal.delete("n0")
+    journal.delete("n1")
+    _wait_for_compaction(journal)
+    journal.add(_note("n3", "note 3", "2026-01-01T09:00:03"))
+    journal._file.close()
+
+    records = _records(journal_path)
+    assert [record["op"] for record in records] == ["add", "add"]
+    assert [record["id"] for record in records] == ["n2", "n3"]
+    assert [note["id"] for note in _JournalNotes(journal_path).list(10)] == ["n3", "n2"]
@@ -0,0 +1,83 @@
+import json
+import os
+import time
+
+import pytest
+
+from engine import profile
+from engine.profile import ProfileStore
+
+
+@pytest.fixture
+def writes(tmp_path, monkeypatch):
+    monkeypatch.setenv("APPDATA", str(tmp_path))
+    monkeypatch.setattr(profile, "_default_profile_path", lambda: str(tmp_path / "missing" / "profile.json"))
+    calls = []
+    real_write = profile._write_profile
+
+    def counting_write(path, data):
+        real_write(path, data)
+        calls.append(dict(data))
+
+    monkeypatch.setattr(profile, "_write_profile", counting_write)
+    return calls
+
+
+def _saved(tmp_path):
+    with open(os.path.join(tmp_path, "MavrickAI", "profile.json"), "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def test_changes_within_the_delay_are_coalesced(writes, tmp_path):
+    store = ProfileStore(delay=60)
+    current = store.load()
+    writes.clear()
+    store.update(dict(current, user_name="Ada"))
+    store.update(dict(current, user_name="Grace"))
+    assert writes == []
+    store.flush()
+    assert [data["user_name"] for data in writes] == ["Grace"]
+    assert _saved(tmp_path)["user_name"] == "Grace"
+
+
+def test_timer_saves_after_the_delay(writes, tmp_path):
+    store = ProfileStore(delay=0.05)
+    current = store.load()
+    writes.clear()
+    store.update(dict(current, persona="friday"))
+    deadline = time.monotonic() + 5
+    while not writes and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(writes) == 1
+    assert _saved(tmp_path)["persona"] == "friday"
+    assert store._timer is None
+
+
+def test_unchanged_profile_is_not_rewritten(writes):
+    store = ProfileStore(delay=60)
+    current = store.load()
+    writes.clear()
+    store.update(dict(current))
+    store.flush()
+    assert writes == []
+    assert store._timer is None
+
+
+def test_reverting_before_the_save_skips_the_write(writes):
+    store = ProfileStore(delay=60)
+    current = store.load()
+    writes.clear()
+    store.update(dict(current, user_name="Ada"))
+    store.update(dict(current))
+    store.flush()
+    assert writes == []
+
+
+def test_zero_delay_writes_immediately(writes, tmp_path):
+    store = ProfileStore(delay=0)
+    current = store.load()
+    writes.clear()
+    returned = store.update(dict(current, voice="Nova"))
+    assert returned["voice"] == "nova"
+    assert len(writes) == 1
+    assert _saved(tmp_path)["voice"] == "nova"
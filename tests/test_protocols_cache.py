@@ -0,0 +1,61 @@
+import json
+import os
+
+import pytest
+
+from engine import actions
+from engine.actions import MavrickActions
+
+
+@pytest.fixture
+def protocols_file(tmp_path, monkeypatch):
+    path = tmp_path / "protocols.json"
+    path.write_text(json.dumps({"work": ["open notepad"]}), encoding="utf-8")
+    monkeypatch.setattr(actions, "_protocols_path", lambda: str(path))
+    monkeypatch.setattr(actions, "_PROTOCOLS_CACHE", None)
+    monkeypatch.setattr(actions, "_PROTOCOL_LISTENERS", [])
+    return path
+
+
+def _edit(path, data, bump_ns=10_000_000):
+    # Force a new mtime even on filesystems with coarse timestamps.
+    stat = os.stat(path)
+    path.write_text(json.dumps(data), encoding="utf-8")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump_ns))
+
+
+def test_unchanged_file_is_served_from_memory(protocols_file):
+    first = actions._load_protocols()
+    assert first == {"work": ["open notepad"]}
+    assert actions._load_protocols() is first
+
+
+def test_outside_edit_is_picked_up_and_announced(protocols_file):
+    seen = []
+    MavrickActions.add_protocols_listener(seen.append)
+    version = MavrickActions.get_protocols_version()
+    _edit(protocols_file, {"work": ["open notepad"], "music": ["open spotify"]})
+    assert actions._load_protocols() == {"work": ["open notepad"], "music": ["open spotify"]}
+    assert MavrickActions.get_protocols_version() == version + 1
+    assert seen == [{"work": ["open notepad"], "music": ["open spotify"]}]
+
+
+def test_touch_without_content_change_keeps_the_version(protocols_file):
+    seen = []
+    MavrickActions.add_protocols_listener(seen.append)
+    version = MavrickActions.get_protocols_version()
+    _edit(protocols_file, {"work": ["open notepad"]})
+    assert MavrickActions.get_protocols_version() == version
+    assert seen == []
+
+
+def test_save_updates_the_cache_without_a_reread(protocols_file, monkeypatch):
+    seen = []
+    MavrickActions.add_protocols_listener(seen.append)
+    version = MavrickActions.get_protocols_version()
+    MavrickActions.save_protocols({"Focus": [" close discord "]})
+    assert seen == [{"focus": ["close discord"]}]
+    assert json.loads(protocols_file.read_text(encoding="utf-8")) == {"focus": ["close discord"]}
+    monkeypatch.setattr(actions.json, "load", lambda file: pytest.fail("protocols.json was re-read"))
+    assert actions._load_protocols() == {"focus": ["close discord"]}
+    assert MavrickActions.get_protocols_version() == version + 1
@@ -0,0 +1,73 @@
+from engine import response_cache
+from engine.response_cache import ResponseCache, is_cacheable_query, normalize_query
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def _clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(response_cache.time, "monotonic", clock.monotonic)
+    return clock
+
+
+def test_normalize_query_strips_wake_words_and_punctuation():
+    assert normalize_query("Hey Mavrick, can you list protocols please?") == "list protocols"
+    assert normalize_query("computer") == ""
+
+
+def test_volatile_queries_are_not_cacheable():
+    assert is_cacheable_query("list protocols")
+    assert not is_cacheable_query("what time is it")
+    assert not is_cacheable_query("hey mavrick")
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = _clock(monkeypatch)
+    cache = ResponseCache(ttl_seconds=10)
+    cache.put("list protocols", 1, "two protocols")
+    clock.now += 9.9
+    assert cache.get("List protocols!", 1) == "two protocols"
+    clock.now += 0.1
+    assert cache.get("list protocols", 1) is None
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_per_entry_ttl_overrides_default(monkeypatch):
+    clock = _clock(monkeypatch)
+    cache = ResponseCache(ttl_seconds=600)
+    cache.put("list skills", 1, "skills", ttl_seconds=5)
+    clock.now += 5
+    assert cache.get("list skills", 1) is None
+
+
+def test_version_is_part_of_the_key(monkeypatch):
+    _clock(monkeypatch)
+    cache = ResponseCache()
+    cache.put("list notes", 1, "old notes")
+    assert cache.get("list notes", 2) is None
+    assert cache.get("list notes", 1) == "old notes"
+
+
+def test_least_recently_used_entry_is_evicted(monkeypatch):
+    _clock(monkeypatch)
+    cache = ResponseCache(max_entries=2)
+    cache.put("first", 1, "a")
+    cache.put("second", 1, "b")
+    assert cache.get("first", 1) == "a"
+    cache.put("third", 1, "c")
+    assert cache.get("second", 1) is None
+    assert cache.get("first", 1) == "a"
+    assert cache.get("third", 1) == "c"
+
+
+def test_empty_responses_are_not_stored():
+    cache = ResponseCache()
+    cache.put("list protocols", 1, "")
+    assert len(cache) == 0